@@ -4,6 +4,9 @@ from pydantic import BaseModel, Field
 import httpx
 import json
 import os
+import re
+import threading
+import time
 from dotenv import load_dotenv
 from typing import Dict, List, Optional, Union, Any
 
@@ -45,6 +48,73 @@ paises_dict = load_json_file("TCA_iar_Paises_origen.json")
 segmentos_dict = load_json_file("TCA_iar_Segmentos_Comp.json")
 tipos_habitacion_dict = load_json_file("TCA_iar_Tipos_Habitaciones.json")
 
+# Monitoreo de drift (opcional): requiere el paquete `reservations_pipeline`
+# instalado y la referencia que genera el pipeline (`drift_reference.json`).
+# Los contadores en memoria se suman cada DRIFT_FLUSH_SECONDS (y al apagar) a
+# DRIFT_STATE_PATH: sobreviven reinicios y varios procesos acumulan en el mismo
+# archivo. Si la referencia cambia (modelo nuevo), el estado se reinicia.
+DRIFT_REFERENCE_PATH = os.getenv("DRIFT_REFERENCE_PATH", "pipeline/data/06_models/drift_reference.json")
+DRIFT_STATE_PATH = os.getenv("DRIFT_STATE_PATH", "pipeline/data/06_models/drift_state_api.json")
+DRIFT_FLUSH_SECONDS = float(os.getenv("DRIFT_FLUSH_SECONDS", "300"))
+drift_reference = None
+drift_monitor = None      # predicciones pendientes desde el último flush
+drift_lock = threading.Lock()
+drift_flush_stop = threading.Event()
+try:
+    from reservations_pipeline.monitoring import DriftMonitor, DriftReference, merge_state_file
+    with open(DRIFT_REFERENCE_PATH, "r", encoding="utf-8") as f:
+        drift_reference = DriftReference.from_dict(json.load(f))
+    drift_monitor = DriftMonitor(drift_reference)
+    print("[DEBUG] Monitoreo de drift habilitado con", DRIFT_REFERENCE_PATH)
+except (ImportError, OSError, ValueError) as e:
+    print(f"[DEBUG] Monitoreo de drift deshabilitado: {str(e)}")
+
+def load_drift_state() -> Optional["DriftMonitor"]:
+    """Estado persistido de la API (None si no existe o es de otra referencia)."""
+    try:
+        with open(DRIFT_STATE_PATH, "r", encoding="utf-8") as f:
+            return DriftMonitor.from_dict(drift_reference, json.load(f))
+    except (OSError, ValueError, KeyError):
+        return None
+
+def flush_drift_state() -> None:
+    """Suma las predicciones pendientes a DRIFT_STATE_PATH y reinicia los contadores."""
+    global drift_monitor
+    if drift_monitor is None:
+        return
+    with drift_lock:
+        pending, drift_monitor = drift_monitor, DriftMonitor(drift_reference)
+    if pending.n_rows == 0:
+        return
+    try:
+        merge_state_file(DRIFT_STATE_PATH, pending, batch_id=f"api-{os.getpid()}-{time.time_ns()}")
+    except OSError as e:
+        print(f"[DEBUG] No se pudo guardar el estado de drift: {str(e)}")
+        with drift_lock:
+            drift_monitor.merge(pending)  # se reintenta en el siguiente flush
+
+def _drift_flush_loop() -> None:
+    while not drift_flush_stop.wait(DRIFT_FLUSH_SECONDS):
+        flush_drift_state()
+
+if drift_monitor is not None:
+    threading.Thread(target=_drift_flush_loop, daemon=True).start()
+
+def observe_prediction(reservation_data: Dict, cluster_id: Any, distance: Optional[float] = None) -> None:
+    """
+    Agrega una predicción al monitor de drift (contadores en memoria fija).
+    Nunca interrumpe la respuesta al usuario.
+    """
+    if drift_monitor is None:
+        return
+    try:
+        columns = {key: [reservation_data.get(key)] for key in reservation_data}
+        distances = [distance] if distance is not None else None
+        with drift_lock:
+            drift_monitor.update(columns, [int(cluster_id)], distances)
+    except Exception as e:
+        print(f"[DEBUG] Error al registrar predicción en el monitor de drift: {str(e)}")
+
 def get_descriptive_value(dictionary: Union[Dict, List], id_value: Union[int, str]) -> str:
     """
     Convierte un ID a su valor descriptivo usando el diccionario o lista correspondiente.
@@ -176,6 +246,153 @@ CLUSTER_DESCRIPTIONS = {
     }
 }
 
+def load_cluster_descriptions(path: str, model_version: Optional[str] = None,
+                              version: Optional[str] = None) -> Optional[Dict[int, Dict]]:
+    """
+    Carga las descripciones que genera el nodo `describe` del pipeline.
+    `path` puede ser el JSON o el directorio versionado de Kedro
+    (`cluster_descriptions.json/<version>/cluster_descriptions.json`):
+
+    - con `model_version` (hash de TabNet del modelo activo) se usa la versión
+      más reciente generada para ese modelo; si ninguna coincide, None
+    - si no, sólo la versión de Kedro `version` (misma corrida que el modelo);
+      si esa corrida no generó descripciones, None: nunca se usan las de otro
+      modelo
+    - sin `model_version` ni `version`, la más reciente
+    """
+    try:
+        candidates = [path]
+        if os.path.isdir(path):
+            filename = os.path.basename(os.path.normpath(path))
+            versions = sorted(
+                (v for v in os.listdir(path)
+                 if os.path.isfile(os.path.join(path, v, filename))),
+                reverse=True,
+            )
+            if model_version is None and version is not None:
+                versions = [version] if version in versions else []
+            candidates = [os.path.join(path, v, filename) for v in versions]
+        for candidate in candidates:
+            with open(candidate, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if model_version is not None and data.get("model_version") != model_version:
+                continue
+            descriptions = {int(k): v for k, v in data["clusters"].items()}
+            print(f"[DEBUG] Descripciones de clusters cargadas desde {candidate} (modelo {data.get('model_version')})")
+            return descriptions
+        print(f"[DEBUG] No hay descripciones generadas para el modelo {model_version or version}; se usan las predeterminadas")
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[DEBUG] No se pudieron cargar descripciones generadas ({str(e)}); se usan las predeterminadas")
+        return None
+
+# Descripciones generadas desde segment_profile; si no existen, las escritas a mano de arriba
+CLUSTER_DESCRIPTIONS_PATH = os.getenv("CLUSTER_DESCRIPTIONS_PATH", "pipeline/data/06_models/cluster_descriptions.json")
+CLUSTER_DESCRIPTIONS = load_cluster_descriptions(CLUSTER_DESCRIPTIONS_PATH) or CLUSTER_DESCRIPTIONS
+
+# Versión activa de `cluster_model` (opcional). El scoring vive en Lambda, así
+# que aquí no se carga el pickle: `ActiveModel` sigue el archivo ACTIVE del
+# registro y mantiene en memoria los metadatos de esa versión y las
+# descripciones generadas para ese mismo modelo (se validan por model_version).
+MODEL_REGISTRY_PATH = os.getenv("MODEL_REGISTRY_PATH", "pipeline/data/06_models/cluster_model.pkl")
+MODEL_METADATA_PATH = os.getenv("MODEL_METADATA_PATH", "pipeline/data/06_models/cluster_model_metadata.json")
+MODEL_POLL_SECONDS = float(os.getenv("MODEL_POLL_SECONDS", "60"))
+active_model = None
+
+def load_active_artifacts(version: str) -> Dict:
+    metadata = model_registry.metadata(version)
+    descriptions = load_cluster_descriptions(CLUSTER_DESCRIPTIONS_PATH,
+                                             model_version=metadata.get("model_version"),
+                                             version=version)
+    return {"metadata": metadata, "descriptions": descriptions}
+
+try:
+    from reservations_pipeline.registry import ActiveModel, ModelRegistry
+    model_registry = ModelRegistry(MODEL_REGISTRY_PATH, metadata_root=MODEL_METADATA_PATH)
+    if model_registry.versions():
+        active_model = ActiveModel(model_registry, loader=load_active_artifacts)
+        active_model.start_polling(MODEL_POLL_SECONDS)
+        print("[DEBUG] Versión activa de cluster_model:", active_model.version)
+except (ImportError, OSError, KeyError, ValueError) as e:
+    print(f"[DEBUG] Registro de modelos deshabilitado: {str(e)}")
+
+def current_cluster_descriptions() -> Dict[int, Dict]:
+    """Descripciones del modelo activo; sin registro, las cargadas al iniciar."""
+    if active_model is not None:
+        _, artifacts = active_model.get()
+        if artifacts and artifacts["descriptions"]:
+            return artifacts["descriptions"]
+    return CLUSTER_DESCRIPTIONS
+
+def _same_name(a: Any, b: Any) -> bool:
+    return " ".join(str(a).split()).upper() == " ".join(str(b).split()).upper()
+
+def explain_cluster_match(reservation_description: Dict, cluster_id: int) -> str:
+    """
+    Explica por qué la reserva cae en `cluster_id` comparándola con el perfil
+    precomputado del cluster (sin llamada al LLM).
+    """
+    cluster = current_cluster_descriptions()[cluster_id]
+    profile = cluster.get("profile")
+    names = cluster.get("names")
+    base = f"Esta reserva coincide con el cluster {cluster_id} ({cluster['name']})"
+    if not profile or not names:
+        return (f"{base} debido a sus características principales: {reservation_description['h_num_per']} personas, "
+                f"{reservation_description['h_num_noc']} noches de estancia, y segmento {reservation_description['segmento']}.")
+
+    matches = []
+    for key, label in [("tipo_habitacion", "tipo de habitación"), ("canal", "canal"),
+                       ("segmento", "segmento"), ("agencia", "agencia")]:
+        if _same_name(reservation_description.get(key), names.get(key)):
+            matches.append(f"{label} {names[key]}, el más común del cluster")
+    try:
+        if abs(float(reservation_description["h_num_per"]) - profile["h_num_per"]) <= 1:
+            matches.append(f"{reservation_description['h_num_per']} personas (promedio del cluster: {profile['h_num_per']:.1f})")
+        if abs(float(reservation_description["h_num_noc"]) - profile["h_num_noc"]) <= 1.5:
+            matches.append(f"{reservation_description['h_num_noc']} noches (promedio del cluster: {profile['h_num_noc']:.1f})")
+        rate = float(reservation_description["h_tfa_total"])
+        if profile["h_tfa_total"] and abs(rate / profile["h_tfa_total"] - 1) <= 0.3:
+            matches.append(f"tarifa de ${rate:,.2f} (promedio del cluster: ${profile['h_tfa_total']:,.2f})")
+    except (TypeError, ValueError, KeyError):
+        pass
+
+    if matches:
+        return f"{base}. Coincidencias principales: " + "; ".join(matches) + "."
+    return f"{base}. Es el perfil más cercano en conjunto, aunque ninguna característica individual coincide con las más frecuentes del cluster."
+
+# Cantidades con unidad de reserva ("2 personas", "3 noches", "$4,500", "tarifa 3000"):
+# un mensaje así describe una reserva a clasificar, no pregunta por un cluster.
+RESERVATION_FIELDS = re.compile(
+    r"\d+\s*(personas?|adultos?|menores|niñ[oa]s?|noches?|habitaci[oó]n(es)?|hab\b|cuartos?)"
+    r"|\$\s*\d|\d\s*(mxn|usd|pesos|d[oó]lares)"
+    r"|(tarifa|precio|costo|llegada|salida)\D{0,15}\d"
+)
+
+def answer_cluster_question(text: str) -> Optional[str]:
+    """
+    Responde preguntas sobre clusters ("¿qué es el cluster 1?", "¿qué son los
+    clusters?") con las descripciones precomputadas. None si no es una de ellas
+    o si el mensaje trae datos de una reserva (eso va al flujo de predicción).
+    """
+    lowered = text.lower()
+    if "cluster" not in lowered or not re.search(r"qu[eé]|cu[aá]l|describe|explica|h[aá]blame|informaci[oó]n", lowered):
+        return None
+    if RESERVATION_FIELDS.search(lowered):
+        return None
+    descriptions = current_cluster_descriptions()
+    match = re.search(r"cluster\s*#?\s*(\d+)", lowered)
+    if match:
+        cluster_id = int(match.group(1))
+        if cluster_id not in descriptions:
+            return f"No existe el cluster {cluster_id}. Los clusters disponibles son: {', '.join(str(c) for c in sorted(descriptions))}."
+        cluster = descriptions[cluster_id]
+        return f"Cluster {cluster_id}: {cluster['name']}\n{cluster['description'].strip()}"
+    if "clusters" in lowered:
+        lines = [f"- Cluster {c}: {descriptions[c]['name']}" for c in sorted(descriptions)]
+        return (f"Las reservas se agrupan en {len(descriptions)} clusters según su perfil "
+                f"(personas, noches, habitaciones, tarifa, canal, agencia y segmento):\n" + "\n".join(lines))
+    return None
+
 class UserMessage(BaseModel):
     userMessage: str
 
@@ -191,6 +408,17 @@ class PredictionResponse(BaseModel):
 async def process_message(message: UserMessage):
     try:
         print("[DEBUG] Mensaje recibido:", message.userMessage)
+
+        # Preguntas sobre clusters: se responden con las descripciones precomputadas
+        cluster_answer = answer_cluster_question(message.userMessage)
+        if cluster_answer is not None:
+            return {"prediction": {
+                "message": cluster_answer,
+                "clusters": [],
+                "explanation": "",
+                "status": "success"
+            }}
+
         # Verificar API key antes de hacer la llamada
         api_key = os.getenv('DEEPSEEK_API_KEY')
         if not api_key:
@@ -203,7 +431,7 @@ Debes seguir estas reglas de conversación:
 
 1. Consultas sobre clusters:
    - Si el usuario pregunta sobre un cluster específico (ej: "qué es el cluster 1?"), responde con la descripción completa del cluster.
-   - Si el usuario pregunta "qué son los clusters?", explica brevemente el sistema de clusters y lista los 5 tipos.
+   - Si el usuario pregunta "qué son los clusters?", explica brevemente el sistema de clusters y lista los {len(current_cluster_descriptions())} tipos.
    - NO devuelvas campos faltantes en estos casos, solo responde la información solicitada.
 
 2. Saludos y cortesía:
@@ -436,8 +664,10 @@ Mensaje de usuario:
                             else:
                                 cluster_id = cluster_info
 
+                            observe_prediction(parsed, cluster_id, lambda_data.get("distance"))
+
                             # Verificar si el cluster existe en nuestras descripciones
-                            if cluster_id not in CLUSTER_DESCRIPTIONS:
+                            if cluster_id not in current_cluster_descriptions():
                                 return {"prediction": {
                                     "message": f"La predicción del cluster es: {cluster_id}",
                                     "clusters": [cluster_id] if isinstance(cluster_id, int) else cluster_info,
@@ -445,89 +675,19 @@ Mensaje de usuario:
                                     "status": "success"
                                 }}
 
-                            # Llamar a Deepseek para analizar el perfil
+                            # Explicación a partir de la descripción precomputada (sin llamada al LLM)
                             reservation_description = get_reservation_description(parsed)
-                            analysis_prompt = f"""
-Analiza brevemente por qué la siguiente reserva coincide con el cluster {cluster_id}.
-Máximo 3 párrafos cortos. Enfócate en las coincidencias más importantes.
-Usa SOLO los valores exactos de los diccionarios. NO hagas suposiciones ni interpretaciones.
-
-Datos de la reserva:
-- Número total de personas: {reservation_description['h_num_per']}
-- Adultos: {reservation_description['h_num_adu']}
-- Menores: {reservation_description['h_num_men']}
-- Noches de estancia: {reservation_description['h_num_noc']}
-- Número de habitaciones: {reservation_description['h_tot_hab']}
-- Tarifa total: ${reservation_description['h_tfa_total']}
-- Tipo de habitación: {reservation_description['tipo_habitacion']}
-- Canal de reserva: {reservation_description['canal']}
-- País de origen: {reservation_description['pais_origen']}
-- Segmento: {reservation_description['segmento']}
-- Agencia: {reservation_description['agencia']}
-
-Descripción del cluster {cluster_id}:
-{CLUSTER_DESCRIPTIONS[cluster_id]['description']}
-
-Proporciona un análisis conciso de por qué esta reserva coincide con este cluster.
-Usa SOLO los valores exactos proporcionados. NO hagas suposiciones ni interpretaciones.
-"""
-                            try:
-                                analysis_response = await client.post(
-                                    "https://api.deepseek.com/v1/chat/completions",
-                                    json={
-                                        "model": "deepseek-chat",
-                                        "messages": [
-                                            {"role": "system", "content": analysis_prompt}
-                                        ],
-                                        "max_tokens": 500,
-                                        "temperature": 0.7,
-                                        "top_p": 1.0,
-                                    },
-                                    headers={
-                                        "Content-Type": "application/json",
-                                        "Authorization": f"Bearer {os.getenv('DEEPSEEK_API_KEY')}",
-                                    },
-                                    timeout=30.0
-                                )
-                                
-                                if analysis_response.status_code == 200:
-                                    analysis_data = analysis_response.json()
-                                    cluster_explanation = analysis_data["choices"][0]["message"]["content"].strip()
-                                    # Limpiar la explicación de caracteres especiales y formato markdown
-                                    cluster_explanation = cluster_explanation.replace("**", "").replace("*", "")
-                                    # Eliminar saltos de línea múltiples y asegurar que la explicación termine correctamente
-                                    cluster_explanation = " ".join(cluster_explanation.split())
-                                    if not cluster_explanation.endswith("."):
-                                        cluster_explanation += "."
-                                else:
-                                    # Si falla el análisis, generar una explicación básica
-                                    cluster_explanation = f"Esta reserva coincide con el cluster {cluster_id} debido a sus características principales: {reservation_description['h_num_per']} personas, {reservation_description['h_num_noc']} noches de estancia, y segmento {reservation_description['segmento']}."
-                                
-                                # Asegurarnos de que la respuesta tenga exactamente el formato esperado
-                                response_data = {
-                                    "prediction": {
-                                        "message": f"La predicción del cluster es: {cluster_id}",
-                                        "clusters": [cluster_id] if isinstance(cluster_id, int) else cluster_info,
-                                        "explanation": cluster_explanation.strip(),
-                                        "status": "success"
-                                    }
-                                }
-                                print("[DEBUG] Respuesta final:", json.dumps(response_data, indent=2))
-                                return response_data
-                            except Exception as e:
-                                print(f"[ERROR] Error al generar análisis del cluster: {str(e)}")
-                                # En caso de error, proporcionar una explicación básica
-                                basic_explanation = f"Esta reserva coincide con el cluster {cluster_id} debido a sus características principales: {reservation_description['h_num_per']} personas, {reservation_description['h_num_noc']} noches de estancia, y segmento {reservation_description['segmento']}."
-                                response_data = {
-                                    "prediction": {
-                                        "message": f"La predicción del cluster es: {cluster_id}",
-                                        "clusters": [cluster_id] if isinstance(cluster_id, int) else cluster_info,
-                                        "explanation": basic_explanation,
-                                        "status": "success"
-                                    }
+                            cluster_explanation = explain_cluster_match(reservation_description, cluster_id)
+                            response_data = {
+                                "prediction": {
+                                    "message": f"La predicción del cluster es: {cluster_id}",
+                                    "clusters": [cluster_id] if isinstance(cluster_id, int) else cluster_info,
+                                    "explanation": cluster_explanation,
+                                    "status": "success"
                                 }
-                                print("[DEBUG] Respuesta final (error):", json.dumps(response_data, indent=2))
-                                return response_data
+                            }
+                            print("[DEBUG] Respuesta final:", json.dumps(response_data, indent=2))
+                            return response_data
                         else:
                             # Si no hay clusters en la respuesta de Lambda, devolver un mensaje simple
                             return {"prediction": {
@@ -577,6 +737,31 @@ Usa SOLO los valores exactos proporcionados. NO hagas suposiciones ni interpreta
         print("[DEBUG] Excepción atrapada:", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/monitoring")
+def monitoring_report():
+    """Reporte de drift: estado persistido más las predicciones aún no guardadas."""
+    if drift_monitor is None:
+        return {"enabled": False}
+    state = load_drift_state() or DriftMonitor(drift_reference)
+    with drift_lock:
+        state.merge(drift_monitor)
+    return {"enabled": True, **state.report()}
+
+@app.on_event("shutdown")
+def save_drift_state():
+    drift_flush_stop.set()
+    flush_drift_state()
+
+@app.get("/api/model")
+def model_info():
+    """Versión activa de `cluster_model` y sus metadatos de entrenamiento."""
+    if active_model is None:
+        return {"enabled": False}
+    version, artifacts = active_model.get()
+    return {"enabled": True, "version": version, "metadata": artifacts["metadata"],
+            "descriptions_loaded": artifacts["descriptions"] is not None,
+            "last_swap": active_model.last_swap}
+
 @app.get("/", include_in_schema=False)
 @app.head("/", include_in_schema=False)
 def root():
@@ -0,0 +1,51 @@
+"""
+Throughput de `assign_clusters` particionado según el número de procesos.
+
+Uso (desde pipeline/):
+    python benchmarks/bench_assign_throughput.py --rows 500000 --workers 1 2 4 8
+
+Carga `reservations_clean` y la última versión de `cluster_model` desde el
+catálogo de Kedro y reporta filas/s y speedup contra 1 proceso.
+"""
+import argparse
+from pathlib import Path
+
+from kedro.framework.session import KedroSession
+from kedro.framework.startup import bootstrap_project
+
+from reservations_pipeline.pipelines.clustering.partitioned import PartitionedScorer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=None, help="filas a usar (default: todas)")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--torch-threads", type=int, default=1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--start-method", default="spawn", choices=["spawn", "forkserver"])
+    args = parser.parse_args()
+
+    bootstrap_project(PROJECT_ROOT)
+    with KedroSession.create(project_path=PROJECT_ROOT) as session:
+        catalog = session.load_context().catalog
+        df = catalog.load("reservations_clean")
+        model = catalog.load("cluster_model")
+
+    if args.rows:
+        df = df.iloc[:args.rows]
+
+    print(f"{'workers':>8} {'rows':>10} {'seconds':>9} {'rows/s':>12} {'speedup':>8}")
+    base = None
+    for n in args.workers:
+        stats = PartitionedScorer(df, model, chunk_size=args.chunk_size,
+                                  n_workers=n, torch_threads=args.torch_threads,
+                                  start_method=args.start_method).run()
+        base = base or stats["rows_per_second"]
+        print(f"{n:>8} {stats['rows']:>10} {stats['wall_seconds']:>9.2f} "
+              f"{stats['rows_per_second']:>12.0f} {stats['rows_per_second'] / base:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
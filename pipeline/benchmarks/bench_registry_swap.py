@@ -0,0 +1,71 @@
+"""
+Latencia del hot-swap de `ActiveModel`.
+
+Uso (desde pipeline/):
+    python benchmarks/bench_registry_swap.py --swaps 20 --readers 8
+
+Alterna entre las versiones disponibles de `cluster_model` mientras
+`--readers` hilos llaman a `get()` en bucle (simulando peticiones en vuelo).
+Reporta el tiempo de carga, el tiempo del intercambio de referencia y la
+latencia máxima observada por los lectores durante los swaps.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from reservations_pipeline.registry import ActiveModel, ModelRegistry
+
+
+def _reader(holder: ActiveModel, stop: threading.Event, worst: list, seen: set):
+    local_worst = 0.0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        version, model = holder.get()
+        local_worst = max(local_worst, time.perf_counter() - t0)
+        assert model is not None
+        seen.add(version)
+    worst.append(local_worst)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--root", default="data/06_models/cluster_model.pkl")
+    parser.add_argument("--swaps", type=int, default=20)
+    parser.add_argument("--readers", type=int, default=8)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    versions = registry.versions()
+    if len(versions) < 2:
+        raise SystemExit("Se necesitan al menos 2 versiones de cluster_model para medir swaps")
+
+    holder = ActiveModel(registry)
+    stop, worst, seen = threading.Event(), [], set()
+    readers = [threading.Thread(target=_reader, args=(holder, stop, worst, seen))
+               for _ in range(args.readers)]
+    for t in readers:
+        t.start()
+
+    loads, swaps = [], []
+    for i in range(args.swaps):
+        target = versions[i % len(versions)]
+        if target == holder.version:
+            target = versions[(i + 1) % len(versions)]
+        holder.refresh(target)
+        loads.append(holder.last_swap["load_seconds"])
+        swaps.append(holder.last_swap["swap_seconds"])
+
+    stop.set()
+    for t in readers:
+        t.join()
+
+    print(f"versiones: {len(versions)}, swaps: {len(swaps)}, lectores: {args.readers}")
+    print(f"carga   : mediana {statistics.median(loads) * 1e3:9.2f} ms, max {max(loads) * 1e3:9.2f} ms")
+    print(f"swap    : mediana {statistics.median(swaps) * 1e6:9.2f} µs, max {max(swaps) * 1e6:9.2f} µs")
+    print(f"get()   : peor latencia de lector {max(worst) * 1e6:9.2f} µs")
+    print(f"versiones vistas por los lectores: {sorted(v for v in seen if v)}")
+
+
+if __name__ == "__main__":
+    main()
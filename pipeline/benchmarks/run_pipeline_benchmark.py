@@ -0,0 +1,141 @@
+"""
+Benchmark del pipeline de clustering sobre datos sintéticos.
+
+Uso (desde pipeline/):
+    python benchmarks/run_pipeline_benchmark.py                      # 10k, 100k, 1M
+    python benchmarks/run_pipeline_benchmark.py --sizes 10000 --max-epochs 5
+    python benchmarks/run_pipeline_benchmark.py --compare benchmarks/results/<sha>.json
+
+Para cada tamaño genera reservaciones con `reservations_pipeline.synthetic`,
+ejecuta clean -> train -> assign -> profile llamando directamente a los nodos
+(con los parámetros de conf/base/parameters.yml) y mide tiempo de pared y pico
+de RSS por nodo. Los resultados se guardan en benchmarks/results/<commit>.json;
+`--compare` imprime el cociente contra otra corrida guardada.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from reservations_pipeline.datasets.embedding_store import EmbeddingStore
+from reservations_pipeline.hooks.memory import PeakRSSSampler
+from reservations_pipeline.pipelines.clustering import nodes
+from reservations_pipeline.synthetic import generate_reservations
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                             capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               cwd=PROJECT_ROOT, capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _measure(fn, *args, **kwargs):
+    sampler = PeakRSSSampler().start()
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    seconds = time.perf_counter() - t0
+    return result, {"seconds": seconds, "peak_rss_mb": sampler.stop() / 2 ** 20}
+
+
+def run_size(n_rows: int, params: dict, store_dir: Path) -> dict:
+    raw, gen = _measure(generate_reservations, n_rows, random_state=params["random_state"])
+    result = {"rows": n_rows, "generate": gen}
+
+    clean, result["clean"] = _measure(nodes.clean_reservations, raw)
+    del raw
+    (model, batch, _), result["train"] = _measure(
+        nodes.train_cluster, clean,
+        n_clusters=params["n_clusters"],
+        random_state=params["random_state"],
+        k_selection=params["k_selection"],
+        tabnet_params=params["tabnet"],
+    )
+    store = EmbeddingStore(store_dir / str(n_rows))
+    store.append(batch["model_version"], batch["keys"], batch["embeddings"])
+    clustered, result["assign"] = _measure(nodes.assign_clusters, clean, model, store)
+    _, result["assign_uncached"] = _measure(nodes.assign_clusters, clean, model)
+    _, result["profile"] = _measure(nodes.profile_segments, clustered)
+
+    result["rows_clean"] = int(len(clean))
+    result["best_k"] = model["best_k"]
+    result["epochs_run"] = model["pretraining"]["epochs_run"]
+    return result
+
+
+def compare(current: dict, baseline: dict) -> None:
+    print(f"\nComparación contra {baseline['commit']} (cociente actual / base; <1 es mejor)")
+    base = {r["rows"]: r for r in baseline["results"]}
+    print(f"{'rows':>9} {'nodo':<16} {'seconds':>9} {'peak_rss':>9}")
+    for r in current["results"]:
+        b = base.get(r["rows"])
+        if b is None:
+            continue
+        for step in ("clean", "train", "assign", "assign_uncached", "profile"):
+            if step in r and step in b:
+                t = r[step]["seconds"] / b[step]["seconds"] if b[step]["seconds"] else float("nan")
+                m = r[step]["peak_rss_mb"] / b[step]["peak_rss_mb"] if b[step]["peak_rss_mb"] else float("nan")
+                print(f"{r['rows']:>9} {step:<16} {t:>9.2f} {m:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--max-epochs", type=int, default=None,
+                        help="sobrescribe tabnet.max_epochs (acota el tiempo de train)")
+    parser.add_argument("--train-sample-rows", type=int, default=None,
+                        help="sobrescribe tabnet.train_sample_rows")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    with open(PROJECT_ROOT / "conf" / "base" / "parameters.yml", encoding="utf-8") as f:
+        params = yaml.safe_load(f)
+    if args.max_epochs is not None:
+        params["tabnet"]["max_epochs"] = args.max_epochs
+    if args.train_sample_rows is not None:
+        params["tabnet"]["train_sample_rows"] = args.train_sample_rows
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "params": {"tabnet": params["tabnet"], "k_selection": params["k_selection"]},
+        "results": [],
+    }
+
+    print(f"{'rows':>9} {'nodo':<16} {'seconds':>9} {'peak_rss_mb':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            r = run_size(n, params, Path(tmp))
+            report["results"].append(r)
+            for step in ("generate", "clean", "train", "assign", "assign_uncached", "profile"):
+                print(f"{n:>9} {step:<16} {r[step]['seconds']:>9.2f} {r[step]['peak_rss_mb']:>12.1f}")
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        out = RESULTS_DIR / f"{report['commit']}.json"
+        out.write_text(json.dumps(report, indent=2, default=float), encoding="utf-8")
+        print(f"\nResultados guardados en {out}")
+
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
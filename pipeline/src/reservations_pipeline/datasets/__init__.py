@@ -0,0 +1,4 @@
+"""Datasets propios del proyecto."""
+from .embedding_store import EmbeddingStore, EmbeddingStoreDataset, row_keys
+
+__all__ = ["EmbeddingStore", "EmbeddingStoreDataset", "row_keys"]
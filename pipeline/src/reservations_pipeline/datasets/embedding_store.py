@@ -0,0 +1,181 @@
+"""
+Almacén de embeddings de TabNet, direccionado por contenido de fila y versión de modelo.
+
+Estructura en disco::
+
+    <path>/<model_version>/shard-00000.keys.npy   # uint64, hash de la fila
+    <path>/<model_version>/shard-00000.emb.npy    # float32 (n, n_d)
+    ...
+
+Los `.emb.npy` se abren con `mmap_mode="r"`, así que una consulta sólo lee
+las filas pedidas. Cada `append` escribe un shard nuevo sólo con las llaves
+que faltaban; el archivo de llaves se escribe al final (con `os.replace`), de
+modo que un shard a medio escribir nunca es visible.
+
+Cada reentrenamiento produce un `model_version` nuevo (y una copia completa de
+los embeddings); `prune` conserva sólo las versiones más recientes. El
+dataset lo aplica en cada `save` si se configura `keep_versions`.
+"""
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+from kedro.io import AbstractDataset
+
+
+def row_keys(df: pd.DataFrame, cols: list) -> np.ndarray:
+    """Hash uint64 del contenido de cada fila (independiente del índice)."""
+    return pd.util.hash_pandas_object(df[cols], index=False).to_numpy(dtype=np.uint64)
+
+
+class EmbeddingStore:
+    """Consulta / inserción de embeddings para una ruta raíz."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._cache = {}  # model_version -> (n_shards, pd.Index, offsets, shards)
+
+    def _version_dir(self, model_version: str) -> Path:
+        return self.path / model_version
+
+    def _shards(self, model_version: str) -> list:
+        d = self._version_dir(model_version)
+        if not d.exists():
+            return []
+        return sorted(p.name[: -len(".keys.npy")] for p in d.glob("shard-*.keys.npy"))
+
+    def _index(self, model_version: str):
+        shards = self._shards(model_version)
+        cached = self._cache.get(model_version)
+        if cached is not None and cached[0] == len(shards):
+            return cached
+
+        d = self._version_dir(model_version)
+        keys = [np.load(d / f"{s}.keys.npy") for s in shards]
+        embs = [np.load(d / f"{s}.emb.npy", mmap_mode="r") for s in shards]
+        offsets = np.cumsum([0] + [len(k) for k in keys])
+        index = pd.Index(np.concatenate(keys) if keys else np.empty(0, dtype=np.uint64))
+        cached = (len(shards), index, offsets, embs)
+        self._cache[model_version] = cached
+        return cached
+
+    def __len__(self) -> int:
+        return sum(len(self._index(v)[1]) for v in self.versions())
+
+    def versions(self) -> list:
+        if not self.path.exists():
+            return []
+        return sorted(p.name for p in self.path.iterdir() if p.is_dir())
+
+    def _last_write(self, model_version: str) -> float:
+        d = self._version_dir(model_version)
+        return max((p.stat().st_mtime for p in d.glob("shard-*.keys.npy")),
+                   default=d.stat().st_mtime)
+
+    def prune(self, keep_versions: int, keep: tuple = ()) -> list:
+        """
+        Borra las versiones de modelo salvo las `keep_versions` escritas más
+        recientemente y las listadas en `keep`. Devuelve las versiones borradas.
+        """
+        versions = sorted(self.versions(), key=self._last_write, reverse=True)
+        removed = [v for v in versions[max(int(keep_versions), 0):] if v not in keep]
+        for v in removed:
+            shutil.rmtree(self._version_dir(v))
+            self._cache.pop(v, None)
+        return removed
+
+    def lookup(self, model_version: str, keys: np.ndarray):
+        """
+        Devuelve (found, embeddings): `found` es una máscara booleana y
+        `embeddings` trae las filas encontradas (en el orden de `keys[found]`),
+        o None si no se encontró ninguna.
+        """
+        _, index, offsets, embs = self._index(model_version)
+        pos = index.get_indexer(keys) if len(index) else np.full(len(keys), -1)
+        found = pos >= 0
+        if not found.any():
+            return found, None
+
+        pos = pos[found]
+        shard = np.searchsorted(offsets, pos, side="right") - 1
+        out = np.empty((len(pos), embs[0].shape[1]), dtype=np.float32)
+        for s in np.unique(shard):
+            sel = shard == s
+            out[sel] = embs[s][pos[sel] - offsets[s]]
+        return found, out
+
+    def append(self, model_version: str, keys: np.ndarray, embeddings: np.ndarray) -> int:
+        """Guarda sólo las llaves que aún no existen. Devuelve cuántas se escribieron."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        found, _ = self.lookup(model_version, keys)
+        new = ~found
+        # llaves repetidas dentro del mismo lote (filas idénticas)
+        _, first = np.unique(keys, return_index=True)
+        unique_mask = np.zeros(len(keys), dtype=bool)
+        unique_mask[first] = True
+        new &= unique_mask
+        if not new.any():
+            return 0
+
+        d = self._version_dir(model_version)
+        d.mkdir(parents=True, exist_ok=True)
+        name = f"shard-{len(self._shards(model_version)):05d}"
+        np.save(d / f"{name}.emb.npy", np.ascontiguousarray(embeddings[new], dtype=np.float32))
+        tmp = d / f"{name}.keys.tmp.npy"
+        np.save(tmp, keys[new])
+        os.replace(tmp, d / f"{name}.keys.npy")
+        return int(new.sum())
+
+    def get_or_compute(self, model_version: str, keys: np.ndarray,
+                       compute: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        Embeddings para todas las `keys`. `compute(mask)` recibe la máscara de
+        filas faltantes y debe devolver sus embeddings; éstas se persisten.
+        """
+        found, cached = self.lookup(model_version, keys)
+        if found.all():
+            return cached
+
+        missing = ~found
+        computed = np.asarray(compute(missing), dtype=np.float32)
+        self.append(model_version, keys[missing], computed)
+
+        out = np.empty((len(keys), computed.shape[1]), dtype=np.float32)
+        out[missing] = computed
+        if cached is not None:
+            out[found] = cached
+        return out
+
+
+class EmbeddingStoreDataset(AbstractDataset[dict, EmbeddingStore]):
+    """
+    Dataset de Kedro para `EmbeddingStore`.
+
+    - `load()` devuelve el `EmbeddingStore` (handle perezoso, memory-mapped).
+    - `save(batch)` recibe {"model_version", "keys", "embeddings"} y agrega
+      las filas nuevas. Con `keep_versions` se borran además las versiones de
+      modelo más antiguas (la del lote guardado siempre se conserva).
+    """
+
+    def __init__(self, path: str, keep_versions: int = None, metadata: dict[str, Any] = None):
+        self._path = path
+        self._keep_versions = keep_versions
+        self.metadata = metadata
+
+    def _load(self) -> EmbeddingStore:
+        return EmbeddingStore(self._path)
+
+    def _save(self, data: dict) -> None:
+        store = EmbeddingStore(self._path)
+        store.append(data["model_version"], data["keys"], data["embeddings"])
+        if self._keep_versions is not None:
+            store.prune(self._keep_versions, keep=(data["model_version"],))
+
+    def _exists(self) -> bool:
+        return Path(self._path).exists()
+
+    def _describe(self) -> dict[str, Any]:
+        return {"path": self._path, "keep_versions": self._keep_versions}
@@ -0,0 +1,4 @@
+"""Hooks de instrumentación del proyecto (tiempos, memoria e I/O por nodo y dataset)."""
+from .project_hooks import ProjectHooks
+
+__all__ = ["ProjectHooks"]
@@ -0,0 +1,66 @@
+"""
+Medición de memoria residente (RSS) por intervalo.
+
+Con `psutil` instalado se muestrea el RSS del proceso en un hilo de fondo y
+se reporta el pico dentro del intervalo. Sin `psutil` se usa
+`resource.getrusage`, que sólo conoce el pico de toda la vida del proceso.
+"""
+import sys
+import threading
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - dependencia opcional
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+def current_rss() -> int:
+    """RSS actual en bytes (0 si no se puede medir)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return process_peak_rss()
+
+
+def process_peak_rss() -> int:
+    """Pico de RSS del proceso desde que arrancó, en bytes."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRSSSampler:
+    """Pico de RSS entre `start()` y `stop()`."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        proc = psutil.Process()
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, proc.memory_info().rss)
+
+    def start(self) -> "PeakRSSSampler":
+        self.peak = current_rss()
+        if psutil is not None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> int:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.peak = max(self.peak, current_rss())
+        return self.peak
@@ -0,0 +1,66 @@
+"""
+Perfilado opcional de un nodo concreto.
+
+- `cprofile`: `cProfile` en el propio proceso; se guarda el `.prof` y un
+  resumen de las 40 funciones con más tiempo acumulado.
+- `py-spy`: lanza `py-spy record` contra el PID actual (muestreo externo,
+  sin overhead en el intérprete) y genera un flamegraph `.svg`. Requiere
+  `py-spy` en el PATH.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import shutil
+import signal
+import subprocess
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class NodeProfiler:
+    def __init__(self, output_dir: Path, node_name: str, mode: str = "cprofile"):
+        self.output_dir = Path(output_dir)
+        self.node_name = node_name
+        self.mode = mode
+        self._profile = None
+        self._proc = None
+
+    def _stem(self) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        return self.output_dir / self.node_name.replace(".", "_")
+
+    def start(self):
+        if self.mode == "py-spy":
+            exe = shutil.which("py-spy")
+            if exe is None:
+                logger.warning("py-spy no está en el PATH; se usa cProfile para '%s'", self.node_name)
+                self.mode = "cprofile"
+            else:
+                self._proc = subprocess.Popen(
+                    [exe, "record", "--pid", str(os.getpid()),
+                     "--output", str(self._stem().with_suffix(".svg")), "--rate", "100"],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                return
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> str:
+        """Detiene el perfilado y devuelve la ruta del artefacto generado."""
+        if self._proc is not None:
+            self._proc.send_signal(signal.SIGINT)
+            self._proc.wait(timeout=60)
+            self._proc = None
+            return str(self._stem().with_suffix(".svg"))
+
+        self._profile.disable()
+        stem = self._stem()
+        self._profile.dump_stats(stem.with_suffix(".prof"))
+        buf = io.StringIO()
+        pstats.Stats(self._profile, stream=buf).sort_stats("cumulative").print_stats(40)
+        stem.with_suffix(".txt").write_text(buf.getvalue(), encoding="utf-8")
+        self._profile = None
+        return str(stem.with_suffix(".prof"))
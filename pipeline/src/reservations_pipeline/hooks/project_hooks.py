@@ -0,0 +1,227 @@
+"""
+Instrumentación de corridas de Kedro.
+
+Por nodo: tiempo de pared, tiempo de CPU, pico de RSS y filas de entrada/salida.
+Por dataset: duración y bytes de cada load/save.
+Al terminar la corrida se escribe un reporte JSON + CSV en `report_dir`.
+
+Variables de entorno (sobrescriben los argumentos del constructor):
+- `PIPELINE_PROFILE_NODE`: nombre del nodo a perfilar (p. ej. `train`)
+- `PIPELINE_PROFILE_MODE`: `cprofile` (default) o `py-spy`
+"""
+import csv
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from kedro.framework.hooks import hook_impl
+
+from .memory import PeakRSSSampler, process_peak_rss
+from .profiling import NodeProfiler
+
+logger = logging.getLogger(__name__)
+
+
+def _rows(data: Any):
+    """Filas de un DataFrame/arreglo, o número de particiones; None si no aplica."""
+    shape = getattr(data, "shape", None)
+    if isinstance(shape, tuple) and len(shape) >= 1:
+        return int(shape[0])
+    if isinstance(data, dict) and data and all(
+        callable(v) or hasattr(v, "shape") for v in data.values()
+    ):
+        return len(data)  # PartitionedDataset
+    return None
+
+
+def _path_bytes(path) -> int:
+    p = Path(str(path))
+    if p.is_file():
+        return p.stat().st_size
+    if p.is_dir():
+        return sum(f.stat().st_size for f in p.rglob("*") if f.is_file())
+    return 0
+
+
+class ProjectHooks:
+    def __init__(self, report_dir: str = "data/08_reporting/run_profiles",
+                 profile_node: str = None, profile_mode: str = "cprofile"):
+        self.report_dir = report_dir
+        self.profile_node = os.environ.get("PIPELINE_PROFILE_NODE", profile_node)
+        self.profile_mode = os.environ.get("PIPELINE_PROFILE_MODE", profile_mode)
+        self._reset()
+
+    def _reset(self):
+        self._catalog = None
+        self._project_path = Path.cwd()
+        self._run_id = None
+        self._run_start = None
+        self._nodes = []
+        self._datasets = []
+        self._open_nodes = {}
+        self._open_io = {}
+        self._profiler = None
+
+    # ── helpers ────────────────────────────────────────────────────────
+    def _dataset_bytes(self, name: str) -> int:
+        """Bytes en disco del dataset (0 para MemoryDataset / rutas remotas)."""
+        try:
+            ds = self._catalog._get_dataset(name)
+        except Exception:  # noqa: BLE001 - cualquier fallo => sin dato
+            return 0
+        try:
+            if hasattr(ds, "_get_load_path"):      # AbstractVersionedDataset
+                return _path_bytes(ds._get_load_path())
+            for attr in ("_filepath", "_path"):
+                if getattr(ds, attr, None) is not None:
+                    return _path_bytes(getattr(ds, attr))
+        except Exception:  # noqa: BLE001
+            pass
+        return 0
+
+    def _start_io(self, kind: str, dataset_name: str):
+        self._open_io[(kind, dataset_name)] = time.perf_counter()
+
+    def _end_io(self, kind: str, dataset_name: str, data: Any, node):
+        t0 = self._open_io.pop((kind, dataset_name), None)
+        if t0 is None:
+            return
+        self._datasets.append({
+            "dataset": dataset_name,
+            "operation": kind,
+            "node": getattr(node, "name", None),
+            "seconds": time.perf_counter() - t0,
+            "bytes": self._dataset_bytes(dataset_name),
+            "rows": _rows(data),
+        })
+
+    # ── hooks de corrida ───────────────────────────────────────────────
+    @hook_impl
+    def after_catalog_created(self, catalog):
+        self._catalog = catalog
+
+    @hook_impl
+    def before_pipeline_run(self, run_params: dict, pipeline, catalog):
+        self._catalog = catalog
+        self._project_path = Path(run_params.get("project_path") or Path.cwd())
+        stamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H.%M.%S")
+        self._run_id = f"{stamp}_{run_params.get('session_id', 'run')}"
+        self._run_start = (time.perf_counter(), time.process_time())
+        self._nodes, self._datasets = [], []
+
+    @hook_impl
+    def after_pipeline_run(self, run_params: dict, pipeline, catalog):
+        self._write_report(run_params, status="success")
+
+    @hook_impl
+    def on_pipeline_error(self, error: Exception, run_params: dict, pipeline, catalog):
+        self._write_report(run_params, status=f"error: {error}")
+
+    # ── hooks de nodo ──────────────────────────────────────────────────
+    @hook_impl
+    def before_node_run(self, node, inputs: dict):
+        if self.profile_node and node.name == self.profile_node:
+            self._profiler = NodeProfiler(self._report_path() / "profiles" / self._run_id,
+                                          node.name, self.profile_mode)
+            self._profiler.start()
+        self._open_nodes[node.name] = (
+            time.perf_counter(), time.process_time(), PeakRSSSampler().start(), inputs,
+        )
+
+    def _end_node(self, node, outputs: dict, status: str):
+        wall0, cpu0, sampler, inputs = self._open_nodes.pop(node.name)
+        wall = time.perf_counter() - wall0
+        cpu = time.process_time() - cpu0
+        record = {
+            "node": node.name,
+            "status": status,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "cpu_utilization": cpu / wall if wall else None,
+            "peak_rss_bytes": sampler.stop(),
+            "rows_in": {k: _rows(v) for k, v in inputs.items() if _rows(v) is not None},
+            "rows_out": {k: _rows(v) for k, v in (outputs or {}).items() if _rows(v) is not None},
+            "profile": None,
+        }
+        if self._profiler is not None and node.name == self.profile_node:
+            record["profile"] = self._profiler.stop()
+            self._profiler = None
+        self._nodes.append(record)
+
+    @hook_impl
+    def after_node_run(self, node, inputs: dict, outputs: dict):
+        self._end_node(node, outputs, "success")
+
+    @hook_impl
+    def on_node_error(self, error: Exception, node, inputs: dict):
+        if node.name in self._open_nodes:
+            self._end_node(node, {}, f"error: {error}")
+
+    # ── hooks de datasets ──────────────────────────────────────────────
+    @hook_impl
+    def before_dataset_loaded(self, dataset_name: str, node):
+        self._start_io("load", dataset_name)
+
+    @hook_impl
+    def after_dataset_loaded(self, dataset_name: str, data: Any, node):
+        self._end_io("load", dataset_name, data, node)
+
+    @hook_impl
+    def before_dataset_saved(self, dataset_name: str, data: Any, node):
+        self._start_io("save", dataset_name)
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str, data: Any, node):
+        self._end_io("save", dataset_name, data, node)
+
+    # ── reporte ────────────────────────────────────────────────────────
+    def _report_path(self) -> Path:
+        path = Path(self.report_dir)
+        return path if path.is_absolute() else self._project_path / path
+
+    def _write_report(self, run_params: dict, status: str):
+        if self._run_start is None:
+            return
+        wall0, cpu0 = self._run_start
+        report = {
+            "run_id": self._run_id,
+            "status": status,
+            "pipeline": run_params.get("pipeline_name") or "__default__",
+            "wall_seconds": time.perf_counter() - wall0,
+            "cpu_seconds": time.process_time() - cpu0,
+            "process_peak_rss_bytes": process_peak_rss(),
+            "nodes": self._nodes,
+            "datasets": self._datasets,
+        }
+
+        out = self._report_path()
+        out.mkdir(parents=True, exist_ok=True)
+        (out / f"{self._run_id}.json").write_text(json.dumps(report, indent=2, default=str),
+                                                  encoding="utf-8")
+
+        # CSV plano: una fila por nodo y una por operación de dataset
+        fields = ["kind", "name", "node", "operation", "status", "wall_seconds",
+                  "cpu_seconds", "peak_rss_bytes", "bytes", "rows"]
+        with open(out / f"{self._run_id}.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for n in self._nodes:
+                writer.writerow({
+                    "kind": "node", "name": n["node"], "node": n["node"], "status": n["status"],
+                    "wall_seconds": round(n["wall_seconds"], 6),
+                    "cpu_seconds": round(n["cpu_seconds"], 6),
+                    "peak_rss_bytes": n["peak_rss_bytes"],
+                    "rows": sum(n["rows_out"].values()) if n["rows_out"] else None,
+                })
+            for d in self._datasets:
+                writer.writerow({
+                    "kind": "dataset", "name": d["dataset"], "node": d["node"],
+                    "operation": d["operation"], "wall_seconds": round(d["seconds"], 6),
+                    "bytes": d["bytes"], "rows": d["rows"],
+                })
+        logger.info("Reporte de perfilado escrito en %s", out / f"{self._run_id}.json")
+        self._run_start = None
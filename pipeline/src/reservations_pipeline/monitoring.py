@@ -0,0 +1,431 @@
+"""
+Monitoreo de drift y de población por cluster, en streaming y memoria fija.
+
+- `DriftReference`: distribución de entrenamiento (bordes de histograma por
+  variable, proporciones esperadas, shares por cluster y distribución de la
+  distancia al centroide). Se construye una vez por modelo.
+- `DriftMonitor`: contadores acumulables (`update`) y combinables (`merge`)
+  sobre los bordes de la referencia: histogramas por variable, conteo por
+  cluster, histograma de distancia al centroide y un buffer circular de
+  `n_windows` ventanas de tiempo con el conteo por cluster. El tamaño del
+  estado no depende del número de filas observadas.
+- `report()`: PSI por variable, shares actuales vs entrenamiento, cuantiles
+  aproximados de distancia y la bandera `retrain` con sus motivos. Todo el
+  reporte es JSON estricto (sin NaN): una métrica sin datos es None.
+
+Cada lote puede llevar un `batch_id`; el monitor recuerda los últimos
+`max_batches` y descarta un lote repetido, de modo que volver a correr el
+pipeline sobre los mismos datos no duplica los conteos. `merge_state_file`
+acumula un monitor en un archivo JSON (lo usa la API para persistir sus
+contadores entre reinicios).
+
+Sólo depende de NumPy para poder usarse también desde la API.
+"""
+import hashlib
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+NUM_VARS = ["h_num_per", "h_num_adu", "h_num_men", "h_num_noc", "h_tot_hab", "h_tfa_total"]
+CAT_VARS = ["ID_Tipo_Habitacion", "ID_canal", "ID_Pais_Origen", "ID_Segmento_Comp", "ID_Agencia"]
+OTHER = "__other__"
+DISTANCE_TAIL_QUANTILES = (0.95, 0.99, 0.995, 0.999)
+_EPS = 1e-4
+
+
+def psi(expected: np.ndarray, actual: np.ndarray):
+    """
+    Population Stability Index entre dos vectores de conteos/proporciones.
+    None si algún lado no tiene conteos (el PSI no está definido).
+    """
+    e = np.asarray(expected, dtype=np.float64)
+    a = np.asarray(actual, dtype=np.float64)
+    if a.sum() == 0 or e.sum() == 0:
+        return None
+    e = np.clip(e / e.sum(), _EPS, None)
+    a = np.clip(a / a.sum(), _EPS, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def _numeric_codes(values, edges: np.ndarray) -> np.ndarray:
+    """Bin de cada valor; los nulos van al último bin (len(edges) + 1)."""
+    x = np.asarray(values, dtype=np.float64)
+    codes = np.searchsorted(edges, x, side="right")
+    codes[np.isnan(x)] = len(edges) + 1
+    return codes
+
+
+def _categorical_codes(values, categories: list) -> np.ndarray:
+    """Posición en `categories`; cualquier otro valor cae en OTHER (último)."""
+    lookup = {c: i for i, c in enumerate(categories)}
+    other = lookup[OTHER]
+    # se resuelve cada valor distinto una sola vez y se expande con el inverso
+    uniq, inverse = np.unique(np.asarray([str(v) for v in values], dtype=object).astype(str),
+                              return_inverse=True)
+    mapped = np.array([lookup.get(u, other) for u in uniq], dtype=np.int64)
+    return mapped[inverse.reshape(-1)]
+
+
+class DriftReference:
+    """Distribución de entrenamiento. Serializable a JSON (`to_dict`/`from_dict`)."""
+
+    def __init__(self, numeric: dict, categorical: dict, cluster_ids: list,
+                 cluster_counts: list, distance_edges: list, distance_counts: list,
+                 distance_min: float = None, distance_max: float = None):
+        self.numeric = numeric            # {col: {"edges": [...], "counts": [...]}}
+        self.categorical = categorical    # {col: {"categories": [...], "counts": [...]}}
+        self.cluster_ids = [int(c) for c in cluster_ids]
+        self.cluster_counts = list(cluster_counts)
+        self.distance_edges = list(distance_edges)
+        self.distance_counts = list(distance_counts)
+        # extremos de la distancia en entrenamiento (acotan el primer y último bin)
+        self.distance_min = distance_min
+        self.distance_max = distance_max
+
+    @classmethod
+    def fit(cls, columns: dict, clusters, distances, n_bins: int = 10,
+            top_n: int = 20, distance_bins: int = 50) -> "DriftReference":
+        """`columns` es {columna: arreglo de valores} (p. ej. un DataFrame vía `df[c]`)."""
+        numeric, categorical = {}, {}
+        for col in NUM_VARS:
+            x = np.asarray(columns[col], dtype=np.float64)
+            qs = np.nanquantile(x, np.linspace(0, 1, n_bins + 1)[1:-1])
+            edges = np.unique(qs)
+            counts = np.bincount(_numeric_codes(x, edges), minlength=len(edges) + 2)
+            numeric[col] = {"edges": edges.tolist(), "counts": counts.tolist()}
+        for col in CAT_VARS:
+            keys, counts = np.unique(np.asarray([str(v) for v in columns[col]]), return_counts=True)
+            order = np.argsort(-counts)[:top_n]
+            categories = keys[order].tolist() + [OTHER]
+            codes = _categorical_codes(columns[col], categories)
+            categorical[col] = {"categories": categories,
+                                "counts": np.bincount(codes, minlength=len(categories)).tolist()}
+
+        clusters = np.asarray(clusters, dtype=np.int64)
+        cluster_ids, cluster_counts = np.unique(clusters, return_counts=True)
+
+        d = np.asarray(distances, dtype=np.float64)
+        # bordes extra en la cola: los cuantiles altos (p95, p99) no se
+        # interpolan dentro de un último bin que llega hasta el máximo
+        probs = np.union1d(np.linspace(0, 1, distance_bins + 1)[1:-1], DISTANCE_TAIL_QUANTILES)
+        d_edges = np.unique(np.quantile(d, probs))
+        d_counts = np.bincount(np.searchsorted(d_edges, d, side="right"), minlength=len(d_edges) + 1)
+        return cls(numeric, categorical, cluster_ids.tolist(), cluster_counts.tolist(),
+                   d_edges.tolist(), d_counts.tolist(), float(d.min()), float(d.max()))
+
+    def to_dict(self) -> dict:
+        return {
+            "numeric": self.numeric,
+            "categorical": self.categorical,
+            "cluster_ids": self.cluster_ids,
+            "cluster_counts": self.cluster_counts,
+            "distance_edges": self.distance_edges,
+            "distance_counts": self.distance_counts,
+            "distance_min": self.distance_min,
+            "distance_max": self.distance_max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DriftReference":
+        return cls(**data)
+
+    def fingerprint(self) -> str:
+        """Hash del contenido: identifica con qué referencia se acumuló un estado."""
+        payload = json.dumps(self.to_dict(), sort_keys=True, default=float)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class DriftMonitor:
+    """Estadísticas acumulables en memoria fija contra una `DriftReference`."""
+
+    def __init__(self, reference: DriftReference, n_windows: int = 90,
+                 window_seconds: int = 86_400, max_batches: int = 1000):
+        self.reference = reference
+        self.n_windows = n_windows
+        self.window_seconds = window_seconds
+        self.max_batches = max_batches
+        self.batch_ids = []
+        self._num_edges = {c: np.asarray(v["edges"]) for c, v in reference.numeric.items()}
+        self._cat_categories = {c: v["categories"] for c, v in reference.categorical.items()}
+        self._cluster_pos = {c: i for i, c in enumerate(reference.cluster_ids)}
+        self._d_edges = np.asarray(reference.distance_edges)
+
+        k = len(reference.cluster_ids) + 1    # +1: cluster no visto en entrenamiento
+        self.n_rows = 0
+        self.numeric_counts = {c: np.zeros(len(e) + 2, dtype=np.int64) for c, e in self._num_edges.items()}
+        self.categorical_counts = {c: np.zeros(len(v), dtype=np.int64) for c, v in self._cat_categories.items()}
+        self.cluster_counts = np.zeros(k, dtype=np.int64)
+        self.distance_counts = np.zeros(len(self._d_edges) + 1, dtype=np.int64)
+        self.distance_min = math.inf
+        self.distance_max = -math.inf
+        self.window_ids = np.full(n_windows, -1, dtype=np.int64)
+        self.window_counts = np.zeros((n_windows, k), dtype=np.int64)
+
+    # ── actualización ──────────────────────────────────────────────────
+    def _cluster_codes(self, clusters) -> np.ndarray:
+        unseen = len(self.reference.cluster_ids)
+        return np.fromiter((self._cluster_pos.get(int(c), unseen) for c in clusters),
+                           dtype=np.int64, count=len(clusters))
+
+    def _remember(self, batch_id: str) -> bool:
+        """Registra `batch_id`; False si ya se había contado."""
+        if batch_id in self.batch_ids:
+            return False
+        self.batch_ids = (self.batch_ids + [batch_id])[-self.max_batches:]
+        return True
+
+    def update(self, columns: dict, clusters, distances=None, timestamps=None,
+               batch_id: str = None) -> bool:
+        """
+        Agrega un lote. `timestamps` son segundos desde epoch (o datetime64);
+        si se omiten, el lote cuenta en la ventana actual. Con `batch_id`, un
+        lote ya contado se ignora. Devuelve True si el lote se agregó.
+        """
+        n = len(clusters)
+        if n == 0:
+            return False
+        if batch_id is not None and not self._remember(batch_id):
+            return False
+        self.n_rows += n
+        for col, edges in self._num_edges.items():
+            if col in columns:
+                codes = _numeric_codes(columns[col], edges)
+                self.numeric_counts[col] += np.bincount(codes, minlength=len(edges) + 2)
+        for col, categories in self._cat_categories.items():
+            if col in columns:
+                codes = _categorical_codes(columns[col], categories)
+                self.categorical_counts[col] += np.bincount(codes, minlength=len(categories))
+
+        k = len(self.cluster_counts)
+        c_codes = self._cluster_codes(clusters)
+        self.cluster_counts += np.bincount(c_codes, minlength=k)
+
+        if distances is not None:
+            d = np.asarray(distances, dtype=np.float64)
+            self.distance_counts += np.bincount(np.searchsorted(self._d_edges, d, side="right"),
+                                                minlength=len(self.distance_counts))
+            self.distance_min = min(self.distance_min, float(d.min()))
+            self.distance_max = max(self.distance_max, float(d.max()))
+
+        if timestamps is None:
+            ts = np.full(n, int(time.time()), dtype=np.int64)
+        else:
+            ts = np.asarray(timestamps)
+            if np.issubdtype(ts.dtype, np.datetime64):
+                ts = ts.astype("datetime64[s]").astype(np.int64)
+            ts = ts.astype(np.int64)
+        windows = ts // self.window_seconds
+        for w in np.unique(windows):
+            self._add_window(int(w), np.bincount(c_codes[windows == w], minlength=k))
+        return True
+
+    def _add_window(self, window_id: int, counts: np.ndarray):
+        slot = window_id % self.n_windows
+        current = self.window_ids[slot]
+        if current == window_id:
+            self.window_counts[slot] += counts
+        elif window_id > current:
+            # la ventana del slot es más vieja que el buffer: se recicla
+            self.window_ids[slot] = window_id
+            self.window_counts[slot] = counts
+        # ventanas más viejas que el buffer se descartan
+
+    def merge(self, other: "DriftMonitor", batch_id: str = None) -> "DriftMonitor":
+        """
+        Combina otro monitor con la misma referencia (p. ej. de otro proceso).
+        Con `batch_id`, un monitor ya combinado antes se ignora.
+        """
+        if batch_id is not None and not self._remember(batch_id):
+            return self
+        for b in other.batch_ids:
+            if b not in self.batch_ids:
+                self.batch_ids.append(b)
+        self.batch_ids = self.batch_ids[-self.max_batches:]
+        self.n_rows += other.n_rows
+        for col in self.numeric_counts:
+            self.numeric_counts[col] += other.numeric_counts[col]
+        for col in self.categorical_counts:
+            self.categorical_counts[col] += other.categorical_counts[col]
+        self.cluster_counts += other.cluster_counts
+        self.distance_counts += other.distance_counts
+        self.distance_min = min(self.distance_min, other.distance_min)
+        self.distance_max = max(self.distance_max, other.distance_max)
+        for slot in range(other.n_windows):
+            if other.window_ids[slot] >= 0:
+                self._add_window(int(other.window_ids[slot]), other.window_counts[slot])
+        return self
+
+    # ── lectura ────────────────────────────────────────────────────────
+    def distance_quantiles(self, qs=(0.5, 0.9, 0.95, 0.99), reference: bool = False) -> dict:
+        """
+        Cuantiles aproximados (interpolación lineal dentro del bin) de lo
+        observado o, con `reference=True`, del entrenamiento. Cada lado usa sus
+        propios extremos: los de la referencia no cambian con los datos nuevos.
+        """
+        if reference:
+            ref = self.reference
+            counts = np.asarray(ref.distance_counts)
+            # referencias anteriores a guardar min/max: los bordes extremos
+            lo = ref.distance_min if ref.distance_min is not None else None
+            hi = ref.distance_max if ref.distance_max is not None else None
+        else:
+            counts = self.distance_counts
+            lo = self.distance_min if math.isfinite(self.distance_min) else None
+            hi = self.distance_max if math.isfinite(self.distance_max) else None
+        total = counts.sum()
+        if total == 0:
+            return {str(q): None for q in qs}
+        if len(self._d_edges) == 0:   # distancia constante en entrenamiento
+            value = hi if hi is not None else 0.0
+            return {str(q): float(value) for q in qs}
+        lo = float(self._d_edges[0]) if lo is None else lo
+        hi = float(self._d_edges[-1]) if hi is None else hi
+        bounds = np.concatenate([[min(lo, self._d_edges[0])], self._d_edges,
+                                 [max(hi, self._d_edges[-1])]])
+        cum = np.cumsum(counts)
+        out = {}
+        for q in qs:
+            target = q * total
+            b = int(np.searchsorted(cum, target, side="left"))
+            prev = cum[b - 1] if b > 0 else 0
+            frac = (target - prev) / counts[b] if counts[b] else 0.0
+            out[str(q)] = float(bounds[b] + frac * (bounds[b + 1] - bounds[b]))
+        return out
+
+    def cluster_timeline(self) -> list:
+        """[{window_start, counts{cluster: n}}] ordenado en el tiempo."""
+        labels = [str(c) for c in self.reference.cluster_ids] + ["unseen"]
+        order = np.argsort(self.window_ids)
+        return [
+            {"window_start": int(self.window_ids[s] * self.window_seconds),
+             "counts": dict(zip(labels, self.window_counts[s].tolist()))}
+            for s in order if self.window_ids[s] >= 0
+        ]
+
+    def report(self, psi_threshold: float = 0.25, share_threshold: float = 0.10,
+               distance_ratio_threshold: float = 1.5, min_rows: int = 1000) -> dict:
+        ref = self.reference
+        if self.n_rows == 0:
+            ref_q = self.distance_quantiles(reference=True)
+            return {
+                "n_rows": 0,
+                "feature_psi": {c: None for c in [*self.numeric_counts, *self.categorical_counts]},
+                "cluster_psi": None,
+                "cluster_share": {},
+                "cluster_timeline": [],
+                "distance_quantiles": {"train": ref_q, "current": self.distance_quantiles(),
+                                       "p95_ratio": None},
+                "retrain": False,
+                "reasons": [],
+            }
+
+        feature_psi = {}
+        for col, counts in self.numeric_counts.items():
+            feature_psi[col] = psi(ref.numeric[col]["counts"], counts)
+        for col, counts in self.categorical_counts.items():
+            feature_psi[col] = psi(ref.categorical[col]["counts"], counts)
+
+        ref_share = np.asarray(ref.cluster_counts, dtype=np.float64)
+        ref_share = ref_share / ref_share.sum()
+        cur = self.cluster_counts / max(self.cluster_counts.sum(), 1)
+        labels = [str(c) for c in ref.cluster_ids]
+        share = {c: {"train": float(r), "current": float(a)}
+                 for c, r, a in zip(labels, ref_share, cur[:-1])}
+        share["unseen"] = {"train": 0.0, "current": float(cur[-1])}
+        cluster_psi = psi(np.append(ref.cluster_counts, 0), self.cluster_counts)
+
+        ref_q = self.distance_quantiles(reference=True)
+        cur_q = self.distance_quantiles()
+        p95_ratio = (cur_q["0.95"] / ref_q["0.95"]
+                     if cur_q["0.95"] is not None and ref_q["0.95"] else None)
+
+        reasons = []
+        if self.n_rows >= min_rows:
+            for col, value in feature_psi.items():
+                if value is not None and value > psi_threshold:
+                    reasons.append(f"PSI {col} = {value:.3f} > {psi_threshold}")
+            for c, s in share.items():
+                if abs(s["current"] - s["train"]) > share_threshold:
+                    reasons.append(f"share cluster {c}: {s['train']:.2f} -> {s['current']:.2f}")
+            if p95_ratio is not None and p95_ratio > distance_ratio_threshold:
+                reasons.append(f"p95 distancia al centroide x{p95_ratio:.2f}")
+
+        return {
+            "n_rows": int(self.n_rows),
+            "feature_psi": feature_psi,
+            "cluster_psi": cluster_psi,
+            "cluster_share": share,
+            "cluster_timeline": self.cluster_timeline(),
+            "distance_quantiles": {"train": ref_q, "current": cur_q, "p95_ratio": p95_ratio},
+            "retrain": bool(reasons),
+            "reasons": reasons,
+        }
+
+    # ── persistencia ───────────────────────────────────────────────────
+    def to_dict(self) -> dict:
+        return {
+            "reference": self.reference.fingerprint(),
+            "n_windows": self.n_windows,
+            "window_seconds": self.window_seconds,
+            "max_batches": self.max_batches,
+            "batch_ids": list(self.batch_ids),
+            "n_rows": self.n_rows,
+            "numeric_counts": {c: v.tolist() for c, v in self.numeric_counts.items()},
+            "categorical_counts": {c: v.tolist() for c, v in self.categorical_counts.items()},
+            "cluster_counts": self.cluster_counts.tolist(),
+            "distance_counts": self.distance_counts.tolist(),
+            "distance_min": self.distance_min if math.isfinite(self.distance_min) else None,
+            "distance_max": self.distance_max if math.isfinite(self.distance_max) else None,
+            "window_ids": self.window_ids.tolist(),
+            "window_counts": self.window_counts.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, reference: DriftReference, data: dict) -> "DriftMonitor":
+        """
+        Reconstruye el estado. Si se acumuló contra otra referencia (otro
+        modelo), los conteos no son comparables y se lanza ValueError.
+        """
+        stored = data.get("reference")
+        if stored is not None and stored != reference.fingerprint():
+            raise ValueError("El estado de drift se acumuló con otra referencia")
+        m = cls(reference, n_windows=data["n_windows"], window_seconds=data["window_seconds"],
+                max_batches=data.get("max_batches", 1000))
+        m.batch_ids = list(data.get("batch_ids", []))
+        m.n_rows = data["n_rows"]
+        m.numeric_counts = {c: np.asarray(v, dtype=np.int64) for c, v in data["numeric_counts"].items()}
+        m.categorical_counts = {c: np.asarray(v, dtype=np.int64) for c, v in data["categorical_counts"].items()}
+        m.cluster_counts = np.asarray(data["cluster_counts"], dtype=np.int64)
+        m.distance_counts = np.asarray(data["distance_counts"], dtype=np.int64)
+        m.distance_min = data["distance_min"] if data["distance_min"] is not None else math.inf
+        m.distance_max = data["distance_max"] if data["distance_max"] is not None else -math.inf
+        m.window_ids = np.asarray(data["window_ids"], dtype=np.int64)
+        m.window_counts = np.asarray(data["window_counts"], dtype=np.int64)
+        return m
+
+
+def merge_state_file(path, monitor: DriftMonitor, batch_id: str = None) -> DriftMonitor:
+    """
+    Suma `monitor` al estado guardado en `path` y lo reescribe de forma atómica
+    (`os.replace`). Un estado inexistente o de otra referencia se reinicia.
+    Devuelve el estado combinado.
+    """
+    path = Path(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = DriftMonitor.from_dict(monitor.reference, json.load(f))
+    except (OSError, ValueError, KeyError):
+        state = DriftMonitor(monitor.reference, n_windows=monitor.n_windows,
+                             window_seconds=monitor.window_seconds,
+                             max_batches=monitor.max_batches)
+    state.merge(monitor, batch_id=batch_id)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state.to_dict()), encoding="utf-8")
+    os.replace(tmp, path)
+    return state
@@ -4,5 +4,7 @@ from reservations_pipeline.pipelines.clustering import pipeline as clustering
 def register_pipelines() -> dict[str, Pipeline]:
     return {
         "clustering": clustering.create_pipeline(),
+        "assign_partitioned": clustering.create_partitioned_pipeline(),
+        "monitoring": clustering.create_monitoring_pipeline(),
         "__default__": clustering.create_pipeline(),
     }
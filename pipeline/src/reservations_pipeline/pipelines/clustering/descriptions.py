@@ -0,0 +1,154 @@
+"""
+Descripciones de clusters para la API, generadas desde `segment_profile`.
+
+Cada cluster recibe un nombre corto (tamaño del grupo, estancia, tarifa
+relativa), una descripción con las medias y las modas resueltas con los
+catálogos TCA, y el perfil numérico que usa la API para explicar una
+predicción sin llamar al LLM. Si dos clusters quedan con el mismo nombre, se
+distinguen con la primera moda (habitación, canal, segmento, agencia, país)
+que los separa.
+"""
+import pandas as pd
+
+# columna -> (llave de ID en el catálogo TCA, campo con el nombre)
+CATALOG_NAME_FIELDS = {
+    "ID_Tipo_Habitacion": ("ID_Tipo_Habitacion", "Tipo_Habitacion_nombre"),
+    "ID_canal": ("ID_canal", "CANAL"),
+    "ID_Pais_Origen": ("ID_Pais_Origen", "Pais_Nombre"),
+    "ID_Segmento_Comp": ("ID_Segmento_Comp", "SEGMENTO ALTERNO"),
+    "ID_Agencia": ("ID_Agencia", "CLIENTE"),
+}
+
+# modas que se prueban, en orden, para distinguir nombres repetidos
+DISAMBIGUATION_FIELDS = [
+    ("ID_Tipo_Habitacion", "habitación"),
+    ("ID_canal", "canal"),
+    ("ID_Segmento_Comp", "segmento"),
+    ("ID_Agencia", "agencia"),
+    ("ID_Pais_Origen", "país"),
+]
+
+
+def _catalog_lookup(records: list, col: str) -> dict:
+    """{ID (str): nombre} para un catálogo TCA."""
+    id_key, name_key = CATALOG_NAME_FIELDS[col]
+    return {str(r[id_key]).strip(): " ".join(str(r.get(name_key, "")).split())
+            for r in records}
+
+
+def _id_str(value) -> str:
+    try:
+        return str(int(float(value)))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _cluster_name(row: pd.Series, rate_ratio: float) -> str:
+    """Nombre corto a partir del tamaño del grupo, la estancia y la tarifa relativa."""
+    if row["h_num_men"] >= 0.15:
+        party = "Familias con niños"
+    elif row["h_num_per"] >= 3:
+        party = "Grupos y familias"
+    elif row["h_num_per"] >= 2:
+        party = "Parejas"
+    else:
+        party = "Viajeros individuales"
+
+    stay = "estancia larga" if row["h_num_noc"] >= 4 else "estancia corta"
+    if rate_ratio >= 1.25:
+        rate = "tarifa alta"
+    elif rate_ratio <= 0.8:
+        rate = "tarifa económica"
+    else:
+        rate = "tarifa media"
+    return f"{party}, {stay}, {rate}"
+
+
+def _unique_names(base: dict, modes: dict) -> dict:
+    """
+    {cluster: nombre} sin repetidos. A cada grupo de clusters con el mismo
+    nombre base se le agrega la primera moda de `DISAMBIGUATION_FIELDS` que es
+    distinta para todos; si ninguna lo es, el número de cluster.
+    """
+    groups = {}
+    for cluster, name in base.items():
+        groups.setdefault(name, []).append(cluster)
+
+    names = dict(base)
+    for name, members in groups.items():
+        if len(members) < 2:
+            continue
+        for col, label in DISAMBIGUATION_FIELDS:
+            values = [modes[c][col] for c in members]
+            if len(set(values)) == len(values):
+                for c, value in zip(members, values):
+                    names[c] = f"{name} ({label} {value})"
+                break
+        else:
+            for c in members:
+                names[c] = f"{name} (cluster {c})"
+    return names
+
+
+def describe_segments(profile: pd.DataFrame, metadata: dict, habitaciones: list,
+                      canales: list, paises: list, segmentos: list,
+                      agencias: list) -> dict:
+    """
+    Genera las descripciones de cada cluster a partir de `segment_profile`
+    (medias y modas por cluster), resolviendo los IDs con los catálogos TCA.
+    `metadata` es `cluster_model_metadata` (model_version, best_k); el
+    resultado se versiona junto al modelo y la API lo asocia por model_version.
+    """
+    catalogs = {
+        "ID_Tipo_Habitacion": _catalog_lookup(habitaciones, "ID_Tipo_Habitacion"),
+        "ID_canal": _catalog_lookup(canales, "ID_canal"),
+        "ID_Pais_Origen": _catalog_lookup(paises, "ID_Pais_Origen"),
+        "ID_Segmento_Comp": _catalog_lookup(segmentos, "ID_Segmento_Comp"),
+        "ID_Agencia": _catalog_lookup(agencias, "ID_Agencia"),
+    }
+    median_rate = profile["h_tfa_total"].median()
+
+    clusters, base_names, modes = {}, {}, {}
+    for _, row in profile.iterrows():
+        key = str(int(row["cluster"]))
+        names = {col: catalogs[col].get(_id_str(row[col]), f"ID {_id_str(row[col])}")
+                 for col in catalogs}
+        rate_ratio = row["h_tfa_total"] / median_rate if median_rate else 1.0
+        description = (
+            f"Perfil: {row['h_num_per']:.1f} personas en promedio "
+            f"({row['h_num_adu']:.1f} adultos, {row['h_num_men']:.2f} menores), "
+            f"{row['h_num_noc']:.1f} noches y {row['h_tot_hab']:.1f} habitaciones\n"
+            f"Tarifa total promedio: ${row['h_tfa_total']:,.2f} "
+            f"({rate_ratio:.2f} veces la mediana de los clusters)\n"
+            f"Habitación típica: {names['ID_Tipo_Habitacion']}\n"
+            f"Canal típico: {names['ID_canal']}\n"
+            f"Agencia típica: {names['ID_Agencia']}\n"
+            f"Segmento: {names['ID_Segmento_Comp']}\n"
+            f"País de origen típico: {names['ID_Pais_Origen']}"
+        )
+        base_names[key] = _cluster_name(row, rate_ratio)
+        modes[key] = names
+        clusters[key] = {
+            "description": description,
+            "profile": {
+                **{c: float(row[c]) for c in ["h_num_per", "h_num_adu", "h_num_men",
+                                              "h_num_noc", "h_tot_hab", "h_tfa_total"]},
+                **{c: _id_str(row[c]) for c in catalogs},
+            },
+            "names": {
+                "tipo_habitacion": names["ID_Tipo_Habitacion"],
+                "canal": names["ID_canal"],
+                "pais_origen": names["ID_Pais_Origen"],
+                "segmento": names["ID_Segmento_Comp"],
+                "agencia": names["ID_Agencia"],
+            },
+        }
+
+    for key, name in _unique_names(base_names, modes).items():
+        clusters[key] = {"name": name, **clusters[key]}
+
+    return {
+        "model_version": metadata.get("model_version"),
+        "best_k": metadata.get("best_k"),
+        "clusters": clusters,
+    }
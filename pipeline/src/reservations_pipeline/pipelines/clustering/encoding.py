@@ -0,0 +1,77 @@
+"""
+Codificación de variables categóricas compartida por entrenamiento e inferencia.
+
+`LabelEncoder.transform` lanza excepción ante cualquier ID no visto en el
+entrenamiento (una agencia nueva tira todo el lote) y hace un sort/búsqueda
+por columna. `CategoryEncoder` guarda el vocabulario como un índice hash
+(`pd.Index`) y resuelve todo el vector de una sola vez con `get_indexer`:
+
+- categorías conocidas -> 0..n-1 (mismo orden que LabelEncoder, ordenadas)
+- IDs no vistos y nulos -> `unknown_code` (= n), un bucket explícito
+"""
+import numpy as np
+import pandas as pd
+
+
+def _as_keys(values) -> pd.Series:
+    """Normaliza a string para que 157, 157.0 y "157" caigan en la misma llave."""
+    s = pd.Series(values, copy=False)
+    if pd.api.types.is_float_dtype(s):
+        try:
+            s = s.astype("Int64")
+        except (TypeError, ValueError):
+            pass  # floats no enteros: se usan tal cual
+    return s.astype("string")
+
+
+class CategoryEncoder:
+    """Vocabulario por columna con bucket de desconocidos y frecuencias de entrenamiento."""
+
+    def __init__(self):
+        self.categories_ = None
+        self.counts_ = None
+        self.unknown_count_ = 0
+        self._index = None
+
+    def fit(self, values) -> "CategoryEncoder":
+        keys = _as_keys(values)
+        counts = keys.value_counts(dropna=True).sort_index()
+        self.categories_ = counts.index.to_numpy(dtype=object)
+        self.counts_ = counts.to_numpy(dtype=np.int64)
+        self.unknown_count_ = int(keys.isna().sum())
+        self._index = pd.Index(self.categories_)
+        return self
+
+    @property
+    def unknown_code(self) -> int:
+        return len(self.categories_)
+
+    @property
+    def frequencies_(self) -> dict:
+        """{categoría: conteo en entrenamiento}."""
+        return dict(zip(self.categories_.tolist(), self.counts_.tolist()))
+
+    def transform(self, values) -> np.ndarray:
+        codes = self._index.get_indexer(_as_keys(values))
+        codes[codes == -1] = self.unknown_code
+        return codes
+
+    def fit_transform(self, values) -> np.ndarray:
+        return self.fit(values).transform(values)
+
+    def unknown_rate(self, values) -> float:
+        """Fracción de valores que caen en el bucket de desconocidos."""
+        codes = self.transform(values)
+        return float((codes == self.unknown_code).mean()) if len(codes) else 0.0
+
+    # El pd.Index se reconstruye al deserializar (pickle más pequeño y estable
+    # entre versiones de pandas).
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_index"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.categories_ is not None:
+            self._index = pd.Index(self.categories_)
@@ -0,0 +1,166 @@
+"""
+Selección de K para KMeans sobre los embeddings de TabNet.
+
+- Rango de K configurable
+- Ajustes de candidatos en paralelo (pool de procesos). Los embeddings se
+  comparten como un `.npy` memory-mapped (no se serializan una vez por
+  candidato) y cada proceso limita sus hilos BLAS/OpenMP para no sobre-suscribir
+  los núcleos. Los procesos se crean con `start_method` (spawn por defecto):
+  un `fork` justo después de entrenar TabNet heredaría los pools de hilos de
+  torch/OpenMP en un estado inconsistente
+- Silhouette sobre una muestra estratificada por cluster (el score completo es O(n²))
+- Calinski-Harabasz / Davies-Bouldin como alternativas baratas
+- MiniBatchKMeans para n grande
+"""
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import (
+    calinski_harabasz_score,
+    davies_bouldin_score,
+    silhouette_score,
+)
+from threadpoolctl import threadpool_limits
+
+# métrica -> True si "más alto es mejor"
+METRICS = {
+    "silhouette": True,
+    "calinski_harabasz": True,
+    "davies_bouldin": False,
+}
+
+
+def candidate_ks(n_clusters: int, cfg: dict) -> list:
+    """
+    Valores de K a evaluar. `k_min`/`k_max` explícitos mandan; si son nulos el
+    rango es `n_clusters ± k_radius` (mínimo 2). `k_radius: 0` evalúa sólo `n_clusters`.
+    """
+    k_min, k_max = cfg.get("k_min"), cfg.get("k_max")
+    radius = cfg.get("k_radius", 1) or 0
+    if k_min is None:
+        k_min = n_clusters - radius
+    if k_max is None:
+        k_max = n_clusters + radius
+    k_min = max(2, int(k_min))
+    if k_max < k_min:
+        raise ValueError(f"Rango de K inválido: [{k_min}, {k_max}]")
+    return list(range(k_min, int(k_max) + 1))
+
+
+def stratified_sample(labels: np.ndarray, sample_size: int, random_state: int) -> np.ndarray:
+    """
+    Índices de una muestra de tamaño ~`sample_size` que respeta la proporción
+    de cada cluster (al menos 2 filas por cluster para que silhouette sea válido).
+    """
+    n = len(labels)
+    if sample_size is None or sample_size >= n:
+        return np.arange(n)
+    rng = np.random.default_rng(random_state)
+    idx = []
+    for k in np.unique(labels):
+        members = np.flatnonzero(labels == k)
+        take = max(2, int(round(sample_size * len(members) / n)))
+        idx.append(rng.choice(members, size=min(take, len(members)), replace=False))
+    return np.sort(np.concatenate(idx))
+
+
+def _make_estimator(k: int, n_rows: int, cfg: dict, random_state: int):
+    algorithm = cfg.get("algorithm", "auto")
+    if algorithm == "auto":
+        algorithm = "minibatch" if n_rows >= cfg.get("minibatch_threshold", 200_000) else "kmeans"
+    if algorithm == "minibatch":
+        return MiniBatchKMeans(n_clusters=k,
+                               batch_size=cfg.get("batch_size", 4096),
+                               random_state=random_state,
+                               n_init="auto"), algorithm
+    return KMeans(n_clusters=k, random_state=random_state, n_init="auto"), algorithm
+
+
+def fit_candidate(embeddings: np.ndarray, k: int, cfg: dict, random_state: int) -> dict:
+    """Ajusta un candidato K y calcula todas las métricas sobre la muestra."""
+    km, algorithm = _make_estimator(k, len(embeddings), cfg, random_state)
+
+    t0 = time.perf_counter()
+    km.fit(embeddings)
+    fit_seconds = time.perf_counter() - t0
+
+    labels = km.labels_
+    idx = stratified_sample(labels, cfg.get("sample_size", 10_000), random_state)
+    X_s, y_s = embeddings[idx], labels[idx]
+
+    scores, timings = {}, {}
+    for metric in cfg.get("metrics", list(METRICS)):
+        t0 = time.perf_counter()
+        if len(np.unique(y_s)) < 2:
+            scores[metric] = float("nan")
+        elif metric == "silhouette":
+            scores[metric] = float(silhouette_score(X_s, y_s))
+        elif metric == "calinski_harabasz":
+            scores[metric] = float(calinski_harabasz_score(X_s, y_s))
+        elif metric == "davies_bouldin":
+            scores[metric] = float(davies_bouldin_score(X_s, y_s))
+        else:
+            raise ValueError(f"Métrica de selección de K desconocida: {metric}")
+        timings[metric] = time.perf_counter() - t0
+
+    return {
+        "k": int(k),
+        "algorithm": algorithm,
+        "inertia": float(km.inertia_),
+        "sample_size": int(len(idx)),
+        "fit_seconds": fit_seconds,
+        "score_seconds": timings,
+        "scores": scores,
+        "model": km,
+    }
+
+
+def _fit_candidate_shared(path: str, k: int, cfg: dict, random_state: int, threads: int) -> dict:
+    """Trabajo de un proceso: embeddings memory-mapped y hilos acotados."""
+    embeddings = np.load(path, mmap_mode="r")
+    with threadpool_limits(limits=threads):
+        return fit_candidate(embeddings, k, cfg, random_state)
+
+
+def select_k(embeddings: np.ndarray, k_values: list, cfg: dict, random_state: int):
+    """
+    Ajusta todos los candidatos (en paralelo si `n_jobs` > 1) y elige el mejor
+    según `cfg["metric"]`.
+
+    Devuelve (mejor_kmeans, mejor_k, mejor_score, candidatos) donde
+    `candidatos` es una lista de dicts con scores y tiempos (sin el modelo).
+    """
+    metric = cfg.get("metric", "silhouette")
+    if metric not in METRICS:
+        raise ValueError(f"Métrica de selección de K desconocida: {metric}")
+    cfg = {**cfg, "metrics": list(dict.fromkeys([metric] + list(cfg.get("metrics", []))))}
+
+    n_jobs = min(cfg.get("n_jobs", 1) or 1, len(k_values))
+    if n_jobs > 1:
+        threads = cfg.get("threads_per_job") or max(1, (os.cpu_count() or 1) // n_jobs)
+        with tempfile.TemporaryDirectory(prefix="kselection-") as tmp:
+            path = Path(tmp) / "embeddings.npy"
+            np.save(path, np.ascontiguousarray(embeddings))
+            context = multiprocessing.get_context(cfg.get("start_method", "spawn"))
+            with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as pool:
+                futures = [pool.submit(_fit_candidate_shared, str(path), k, cfg,
+                                       random_state, threads)
+                           for k in k_values]
+                results = [f.result() for f in futures]
+    else:
+        results = [fit_candidate(embeddings, k, cfg, random_state) for k in k_values]
+
+    higher_is_better = METRICS[metric]
+    valid = [r for r in results if not np.isnan(r["scores"][metric])]
+    if not valid:
+        valid = results
+    best = (max if higher_is_better else min)(valid, key=lambda r: r["scores"][metric])
+
+    candidates = [{key: val for key, val in r.items() if key != "model"} for r in results]
+    return best["model"], best["k"], best["scores"][metric], candidates
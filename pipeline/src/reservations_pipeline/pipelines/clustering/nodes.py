@@ -1,11 +1,28 @@
+import hashlib
+import logging
+import time
+
 import pandas as pd
 import numpy as np
 import torch
 
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import silhouette_score
-from pytorch_tabnet.pretraining import TabNetPretrainer
+from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+from reservations_pipeline.datasets.embedding_store import EmbeddingStore, row_keys
+from reservations_pipeline.monitoring import CAT_VARS, NUM_VARS, DriftMonitor, DriftReference
+from reservations_pipeline.registry import model_metadata
+
+from .descriptions import describe_segments  # noqa: F401 - nodo `describe`
+from .encoding import CategoryEncoder
+from .kselection import candidate_ks, select_k
+from .partitioned import PartitionedScorer
+from .pretraining import pretrain_tabnet
+from .scoring import predict, tabnet_fingerprint
+from .surrogate import SurrogateScorer, surrogate_features
+
+logger = logging.getLogger(__name__)
 
 # ---------- 1) LIMPIEZA ----------
 def clean_reservations(df: pd.DataFrame) -> pd.DataFrame:
@@ -66,20 +83,25 @@ def clean_reservations(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # ---------- 2) ENTRENAMIENTO ----------
-def train_cluster(df: pd.DataFrame, n_clusters: int, random_state: int):
+def train_cluster(df: pd.DataFrame, n_clusters: int, random_state: int,
+                  k_selection: dict, tabnet_params: dict):
     """
     1) Fijar semilla en NumPy y PyTorch para reproducibilidad
-    2) Codifica variables categóricas con LabelEncoder
-    3) Pre-entrena TabNet (unsupervised)
-    4) Extrae embeddings
-    5) Busca el mejor K (4-5) con Silhouette y guarda KMeans
-    6) Devuelve un diccionario con todo el pipeline
+    2) Codifica variables categóricas con CategoryEncoder (bucket para IDs no vistos)
+    3) Pre-entrena TabNet (unsupervised) según `tabnet_params` (ver `pretraining.py`):
+       submuestra estratificada opcional y validación sobre una muestra separada
+    4) Extrae embeddings de todas las filas
+    5) Busca el mejor K alrededor de `n_clusters` (ver `kselection.candidate_ks`
+       y `kselection.select_k`) y guarda KMeans
+    6) Devuelve un diccionario con todo el pipeline, los embeddings calculados
+       (para `reservation_embeddings`, así `assign_clusters` no los recalcula)
+       y sus metadatos (para `cluster_model_metadata`, que lee `ModelRegistry`)
     """
 
     # ── 1) FIJAR SEMILLA EN NUMPY Y PYTORCH ─────────────────────────────
+    t_start = time.perf_counter()
     np.random.seed(random_state)
     torch.manual_seed(random_state)
-    torch.use_deterministic_algorithms(True)
 
     # ── 2) Definir variables numéricas y categóricas ───────────────────
     num_vars = [
@@ -91,11 +113,11 @@ def train_cluster(df: pd.DataFrame, n_clusters: int, random_state: int):
         "ID_Segmento_Comp", "ID_Agencia"
     ]
 
-    # ── 3) LabelEncode ─────────────────────────────────────────────────
+    # ── 3) Codificar categóricas ───────────────────────────────────────
     X = df[num_vars + cat_vars].copy()
-    encoders: dict[str, LabelEncoder] = {}
+    encoders: dict[str, CategoryEncoder] = {}
     for col in cat_vars:
-        enc = LabelEncoder().fit(X[col])
+        enc = CategoryEncoder().fit(X[col])
         X[col] = enc.transform(X[col])
         encoders[col] = enc
 
@@ -106,81 +128,78 @@ def train_cluster(df: pd.DataFrame, n_clusters: int, random_state: int):
     X_array = X.astype("float32").to_numpy()
 
     # ── 5) Preentrenar TabNet ────────────────────────────────────────────
-    tabnet = TabNetPretrainer(
-        optimizer_fn=torch.optim.Adam,
-        optimizer_params=dict(lr=1e-3),
-        seed=random_state,   # TabNet interno usará esta semilla también
-        verbose=0,
-    )
-    tabnet.fit(
-        X_train=X_array,
-        eval_set=[X_array],
-        max_epochs=100,
-        patience=10,
-        batch_size=256,
-        virtual_batch_size=128,
-    )
+    stratify_col = tabnet_params.get("stratify_col")
+    strata = X[stratify_col].to_numpy() if stratify_col else np.zeros(len(X), dtype=int)
+    tabnet, pretraining = pretrain_tabnet(X_array, strata, tabnet_params, random_state)
 
-    # ── 6) Extraer embeddings ───────────────────────────────────────────
+    # ── 6) Extraer embeddings (todas las filas, no sólo la submuestra) ───
     embeddings, _ = tabnet.predict(X_array)
 
-    # ── 7) Buscar K óptimo entre [4,5] usando Silhouette ───────────────
-    best_score = -1.0
-    best_k = None
-    best_km = None
-    for k in range(4, 6):  # sólo probamos k=4 y k=5
-        km = KMeans(n_clusters=k,
-                    random_state=random_state,
-                    n_init="auto")
-        km.fit(embeddings)
-        score = silhouette_score(embeddings, km.labels_)
-        if score > best_score:
-            best_score, best_k, best_km = score, k, km
+    # ── 7) Buscar K óptimo en el rango configurado ─────────────────────
+    k_values = candidate_ks(n_clusters, k_selection)
+    best_km, best_k, best_score, k_candidates = select_k(
+        embeddings, k_values, k_selection, random_state
+    )
+    best_sil = next(c for c in k_candidates if c["k"] == best_k)["scores"].get("silhouette")
 
     # ── 8) Empaquetar todo en un diccionario para retornarlo ──────────
+    version = tabnet_fingerprint(tabnet)
     pipeline_dict = {
+        "model_version": version,
         "encoders": encoders,
         "tabnet":   tabnet,
         "kmeans":   best_km,
         "num_vars": num_vars,
         "cat_vars": cat_vars,
         "best_k":   best_k,
-        "sil_score": best_score,
+        "sil_score": best_sil,
+        "k_metric": k_selection.get("metric", "silhouette"),
+        "k_score":  best_score,
+        "k_candidates": k_candidates,
+        "pretraining": pretraining,
+        "n_rows":   int(len(df)),
+        "training_seconds": time.perf_counter() - t_start,
+    }
+    embedding_batch = {
+        "model_version": version,
+        "keys": row_keys(df, num_vars + cat_vars),
+        "embeddings": embeddings,
     }
-    return pipeline_dict
+    return pipeline_dict, embedding_batch, model_metadata(pipeline_dict)
 
 
 # ---------- 3) PREDICCIÓN ----------
-def assign_clusters(df: pd.DataFrame, model: dict) -> pd.DataFrame:
+def assign_clusters(df: pd.DataFrame, model: dict,
+                    embedding_store: EmbeddingStore = None) -> pd.DataFrame:
     """
     Usa el diccionario `model` devuelto por train_cluster para:
-    - codificar categóricas con los LabelEncoder entrenados
-    - pasar por TabNet y obtener embeddings
+    - codificar categóricas con los encoders entrenados (IDs no vistos -> bucket desconocido)
+    - obtener embeddings: se reutilizan los de `embedding_store` y sólo se pasa
+      por TabNet las filas que no estén ya guardadas para esta versión del modelo
     - asignar etiquetas de KMeans
-    Devuelve df con una columna adicional `cluster`.
+    Devuelve df con las columnas adicionales `cluster` y `centroid_distance`
+    (distancia al centroide asignado, usada por el monitoreo de drift).
     """
-    num_vars = model["num_vars"]
-    cat_vars = model["cat_vars"]
-    encoders = model["encoders"]
-    tabnet   = model["tabnet"]
-    kmeans   = model["kmeans"]
-
-    # 1) Preparar X con las columnas numéricas + categóricas
-    X = df[num_vars + cat_vars].copy()
-    for col in cat_vars:
-        X[col] = encoders[col].transform(X[col])
+    # Codificar -> embeddings TabNet -> KMeans (ver scoring.py)
+    labels, distances = predict(df, model, embedding_store)
+    return df.assign(cluster=labels, centroid_distance=distances)
 
-    X_array = X.values.astype(np.float32)
 
-    # 2) Obtener embeddings con TabNet
-    embeddings, _ = tabnet.predict(X_array)
-
-    # 3) Predecir clusters usando KMeans
-    labels = kmeans.predict(embeddings)
-
-    df_out = df.copy()
-    df_out["cluster"] = labels
-    return df_out
+def assign_clusters_partitioned(df: pd.DataFrame, model: dict, params: dict) -> dict:
+    """
+    Igual que `assign_clusters`, pero por bloques en un pool de procesos.
+    Devuelve {partition_id: callable} para un PartitionedDataset de Parquet:
+    cada bloque se calcula y escribe al momento de guardarlo.
+    """
+    scorer = PartitionedScorer(
+        df, model,
+        chunk_size=params.get("chunk_size", 250_000),
+        n_workers=params.get("n_workers"),
+        torch_threads=params.get("torch_threads", 1),
+        max_pending=params.get("max_pending"),
+        start_method=params.get("start_method", "spawn"),
+    )
+    return scorer.partitions()
 
 
 # ---------- 4) PERFIL ----------
@@ -222,3 +241,146 @@ def profile_segments(df: pd.DataFrame) -> pd.DataFrame:
         .reset_index()
     )
     return summary
+
+
+# ---------- 5) MODELO SUSTITUTO ----------
+def train_surrogate(df: pd.DataFrame, params: dict):
+    """
+    Destila TabNet+KMeans en un árbol de decisión poco profundo:
+
+    1) Toma `reservations_clustered` (etiquetas del modelo completo)
+    2) Ajusta un DecisionTreeClassifier sobre las variables originales
+    3) Mide fidelidad contra el modelo completo en un holdout
+    4) Mide latencia por fila (lote vectorizado y fila individual)
+
+    Devuelve (SurrogateScorer, dict de métricas).
+    """
+    num_vars = ["h_num_per", "h_num_adu", "h_num_men",
+                "h_num_noc", "h_tot_hab", "h_tfa_total"]
+    cat_vars = ["ID_Tipo_Habitacion", "ID_canal", "ID_Pais_Origen",
+                "ID_Segmento_Comp", "ID_Agencia"]
+    random_state = params.get("random_state", 42)
+
+    # 1) Matriz de features y etiquetas del modelo completo
+    X = surrogate_features(df, num_vars, cat_vars)
+    y = df["cluster"].to_numpy()
+
+    # 2) Holdout estratificado por cluster (sin estratificar si algún cluster
+    #    tiene menos de 2 filas: train_test_split no puede repartirlo)
+    _, class_counts = np.unique(y, return_counts=True)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y,
+        test_size=params.get("test_size", 0.2),
+        stratify=y if class_counts.min() >= 2 else None,
+        random_state=random_state,
+    )
+
+    tree = DecisionTreeClassifier(
+        max_depth=params.get("max_depth", 8),
+        min_samples_leaf=params.get("min_samples_leaf", 20),
+        random_state=random_state,
+    ).fit(X_train, y_train)
+    scorer = SurrogateScorer(tree, num_vars, cat_vars, tree.classes_)
+
+    # 3) Fidelidad: qué tanto reproduce las etiquetas de TabNet+KMeans
+    y_pred = scorer.predict(X_test)
+    labels = np.unique(y)
+    report = classification_report(y_test, y_pred, labels=labels,
+                                   output_dict=True, zero_division=0)
+
+    # 4) Latencia: lote vectorizado y fila individual
+    t0 = time.perf_counter()
+    scorer.predict(X_test)
+    batch_us = (time.perf_counter() - t0) / max(len(X_test), 1) * 1e6
+
+    records = df.iloc[:min(len(df), 1000)][num_vars + cat_vars].to_dict("records")
+    t0 = time.perf_counter()
+    for rec in records:
+        scorer.predict_one(rec)
+    single_us = (time.perf_counter() - t0) / max(len(records), 1) * 1e6
+
+    metrics = {
+        "fidelity": float((y_pred == y_test).mean()),
+        "per_cluster": {
+            str(k): {m: float(report[str(k)][m]) for m in ("precision", "recall", "f1-score")}
+            for k in labels
+        },
+        "confusion_matrix": confusion_matrix(y_test, y_pred, labels=labels).tolist(),
+        "labels": [int(k) for k in labels],
+        "n_train": int(len(X_train)),
+        "n_test": int(len(X_test)),
+        "tree_depth": int(tree.get_depth()),
+        "n_leaves": int(tree.get_n_leaves()),
+        "batch_us_per_row": batch_us,
+        "single_row_us": single_us,
+    }
+    return scorer, metrics
+
+
+# ---------- 6) MONITOREO DE DRIFT ----------
+def _monitor_columns(df: pd.DataFrame) -> dict:
+    """Columnas en el formato que espera `monitoring` (float con NaN / strings)."""
+    cols = {c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            for c in NUM_VARS}
+    cols.update({c: df[c].astype("string").fillna("<NA>").to_numpy(dtype=object)
+                 for c in CAT_VARS})
+    return cols
+
+
+def _monitor_timestamps(df: pd.DataFrame, params: dict):
+    time_col = params.get("time_col")
+    if not time_col or time_col not in df:
+        return None
+    ts = pd.to_datetime(df[time_col], errors="coerce")
+    # sin fecha -> se cuenta en la ventana de la fecha más reciente del lote
+    return ts.fillna(ts.max()).to_numpy(dtype="datetime64[s]")
+
+
+def build_drift_reference(df: pd.DataFrame, params: dict):
+    """
+    A partir de `reservations_clustered` del entrenamiento:
+    1) Construye la referencia (histogramas, shares por cluster, distancias)
+    2) Devuelve además un estado de monitoreo vacío: cada modelo nuevo
+       reinicia los contadores.
+    """
+    reference = DriftReference.fit(
+        _monitor_columns(df), df["cluster"].to_numpy(), df["centroid_distance"].to_numpy(),
+        n_bins=params.get("n_bins", 10),
+        top_n=params.get("top_n_categories", 20),
+        distance_bins=params.get("distance_bins", 50),
+    )
+    monitor = DriftMonitor(reference,
+                           n_windows=params.get("n_windows", 90),
+                           window_seconds=params.get("window_seconds", 86_400),
+                           max_batches=params.get("max_batches", 1000))
+    return reference.to_dict(), monitor.to_dict()
+
+
+def _batch_id(df: pd.DataFrame) -> str:
+    """Hash del contenido del lote (independiente del índice)."""
+    keys = pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+    return hashlib.sha1(keys.tobytes()).hexdigest()[:16]
+
+
+def monitor_drift(df: pd.DataFrame, reference: dict, state: dict, params: dict):
+    """
+    Agrega un lote de reservas nuevas ya asignadas al estado acumulado y
+    devuelve (estado actualizado, reporte con PSI, shares, distancias y
+    bandera `retrain`). El lote se identifica por su contenido: volver a
+    correr sobre los mismos datos no cambia el estado.
+    """
+    ref = DriftReference.from_dict(reference)
+    monitor = DriftMonitor.from_dict(ref, state)
+    batch_id = _batch_id(df)
+    if not monitor.update(_monitor_columns(df), df["cluster"].to_numpy(),
+                          df["centroid_distance"].to_numpy(), _monitor_timestamps(df, params),
+                          batch_id=batch_id):
+        logger.info("Lote %s ya incluido en el estado de drift; no se vuelve a contar", batch_id)
+
+    report = monitor.report(
+        psi_threshold=params.get("psi_threshold", 0.25),
+        share_threshold=params.get("share_threshold", 0.10),
+        distance_ratio_threshold=params.get("distance_ratio_threshold", 1.5),
+        min_rows=params.get("min_rows", 1000),
+    )
+    return monitor.to_dict(), report
@@ -0,0 +1,158 @@
+"""
+Modo de asignación particionado.
+
+`reservations_clean` se divide en bloques de `chunk_size` filas; cada bloque
+se codifica, pasa por TabNet y KMeans en un pool de procesos, y se entrega a
+un `PartitionedDataset` de Parquet mediante *lazy saving*: Kedro llama a cada
+callable al guardar la partición, de modo que nunca se materializa la copia
+completa de `reservations_clustered` en memoria. Sólo hay, como mucho,
+`max_pending` bloques en vuelo.
+
+Los procesos se crean con `spawn` por defecto (torch no es seguro tras un
+`fork` con hilos ya creados) y sólo ellos ajustan `torch.set_num_threads`;
+en modo serial el proceso de Kedro no se toca.
+"""
+import logging
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+import torch
+
+from .scoring import predict
+
+logger = logging.getLogger(__name__)
+
+_WORKER_MODEL = None
+
+
+def _init_worker(model: dict, torch_threads: int):
+    """Inicializador del pool: el modelo se deserializa una sola vez por proceso."""
+    global _WORKER_MODEL
+    _WORKER_MODEL = model
+    if torch_threads:
+        torch.set_num_threads(torch_threads)
+
+
+def _score_chunk(chunk: pd.DataFrame, model: dict = None):
+    """Trabajo de un proceso: `chunk` ya es una copia privada (viene serializado)."""
+    t0 = time.perf_counter()
+    chunk["cluster"], chunk["centroid_distance"] = predict(chunk, model or _WORKER_MODEL)
+    return chunk, time.perf_counter() - t0
+
+
+class PartitionedScorer:
+    """
+    Orquesta el scoring por bloques con una ventana deslizante de trabajos
+    enviados al pool. `partitions()` devuelve el dict {partition_id: callable}
+    que espera `PartitionedDataset` para el lazy saving.
+
+    Los bloques pueden pedirse en cualquier orden (un bloque ya consumido se
+    recalcula). Si un bloque falla, o el objeto se descarta sin consumir todos
+    los bloques, el pool se cierra y los trabajos pendientes se cancelan.
+    """
+
+    def __init__(self, df: pd.DataFrame, model: dict, chunk_size: int = 250_000,
+                 n_workers: int = None, torch_threads: int = 1, max_pending: int = None,
+                 start_method: str = "spawn"):
+        self.df = df
+        self.model = model
+        self.chunk_size = int(chunk_size)
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.torch_threads = torch_threads
+        self.max_pending = max_pending or 2 * self.n_workers
+        self.start_method = start_method
+        self.bounds = [(start, min(start + self.chunk_size, len(df)))
+                       for start in range(0, len(df), self.chunk_size)]
+
+        self._pool = None
+        self._finalizer = None
+        self._futures = {}
+        self._next = 0
+        self._done = set()
+        self._t_start = None
+        self.stats = {"rows": 0, "chunks": 0, "wall_seconds": 0.0, "worker_seconds": 0.0}
+
+    # ── gestión del pool ───────────────────────────────────────────────
+    def _submit(self, i: int):
+        start, stop = self.bounds[i]
+        self._futures[i] = self._pool.submit(_score_chunk, self.df.iloc[start:stop])
+
+    def _submit_until(self, i: int):
+        while self._next < len(self.bounds) and self._next <= i:
+            self._submit(self._next)
+            self._next += 1
+
+    def _start(self):
+        self._t_start = time.perf_counter()
+        if self.n_workers > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(self.model, self.torch_threads),
+            )
+            # si nadie consume todos los bloques, el pool no queda huérfano
+            self._finalizer = weakref.finalize(self, self._pool.shutdown,
+                                               wait=False, cancel_futures=True)
+
+    def _shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._finalizer.detach()
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+            self._pool = None
+            self._futures.clear()
+
+    def _finish(self):
+        self._shutdown()
+        wall = time.perf_counter() - self._t_start
+        self.stats["wall_seconds"] = wall
+        self.stats["rows_per_second"] = self.stats["rows"] / wall if wall else float("nan")
+        logger.info(
+            "assign particionado: %d filas en %d bloques, %.1fs (%.0f filas/s, %d workers)",
+            self.stats["rows"], self.stats["chunks"], wall,
+            self.stats["rows_per_second"], self.n_workers,
+        )
+
+    def _result(self, i: int):
+        if self._pool is None:
+            start, stop = self.bounds[i]
+            return _score_chunk(self.df.iloc[start:stop].copy(), self.model)
+
+        self._submit_until(i + self.max_pending - 1)
+        if i not in self._futures:      # ya consumido antes: se recalcula
+            self._submit(i)
+        return self._futures.pop(i).result()
+
+    # ── API ─────────────────────────────────────────────────────────────
+    def chunk(self, i: int) -> pd.DataFrame:
+        """Resultado del bloque `i`."""
+        if self._t_start is None:
+            self._start()
+        try:
+            out, seconds = self._result(i)
+        except BaseException:
+            self._shutdown(wait=False)
+            raise
+
+        if i not in self._done:
+            self._done.add(i)
+            self.stats["rows"] += len(out)
+            self.stats["chunks"] += 1
+            self.stats["worker_seconds"] += seconds
+            if len(self._done) == len(self.bounds):
+                self._finish()
+        return out
+
+    def partitions(self) -> dict:
+        return {f"part-{i:05d}": partial(self.chunk, i) for i in range(len(self.bounds))}
+
+    def run(self) -> dict:
+        """Consume todos los bloques sin guardarlos; útil para medir throughput."""
+        for i in range(len(self.bounds)):
+            self.chunk(i)
+        return dict(self.stats)
@@ -10,15 +10,74 @@ def create_pipeline(**kwargs):
         node(nodes.train_cluster,
              inputs=dict(df="reservations_clean",
                          n_clusters="params:n_clusters",
-                         random_state="params:random_state"),
-             outputs="cluster_model",
+                         random_state="params:random_state",
+                         k_selection="params:k_selection",
+                         tabnet_params="params:tabnet"),
+             outputs=["cluster_model", "reservation_embeddings", "cluster_model_metadata"],
              name="train"),
         node(nodes.assign_clusters,
-             inputs=["reservations_clean", "cluster_model"],
+             inputs=["reservations_clean", "cluster_model", "reservation_embeddings"],
              outputs="reservations_clustered",
              name="assign"),
         node(nodes.profile_segments,
              inputs="reservations_clustered",
              outputs="segment_profile",
              name="profile"),
+        node(nodes.describe_segments,
+             inputs=dict(profile="segment_profile",
+                         metadata="cluster_model_metadata",
+                         habitaciones="tca_tipos_habitacion",
+                         canales="tca_canales",
+                         paises="tca_paises_origen",
+                         segmentos="tca_segmentos_comp",
+                         agencias="tca_agencias"),
+             outputs="cluster_descriptions",
+             name="describe"),
+        node(nodes.train_surrogate,
+             inputs=dict(df="reservations_clustered",
+                         params="params:surrogate"),
+             outputs=["cluster_surrogate", "surrogate_metrics"],
+             name="train_surrogate"),
+        node(nodes.build_drift_reference,
+             inputs=dict(df="reservations_clustered",
+                         params="params:drift"),
+             outputs=["drift_reference", "drift_state_reset"],
+             name="drift_reference"),
+    ])
+
+
+def create_partitioned_pipeline(**kwargs):
+    """Asignación por bloques en paralelo sobre un modelo ya entrenado."""
+    return pipeline([
+        node(nodes.assign_clusters_partitioned,
+             inputs=dict(df="reservations_clean",
+                         model="cluster_model",
+                         params="params:assign_partitioned"),
+             outputs="reservations_clustered_partitioned",
+             name="assign_partitioned"),
+    ])
+
+
+def create_monitoring_pipeline(**kwargs):
+    """
+    Limpia y asigna el lote de reservas nuevas (`reservations_incoming`) con el
+    modelo vigente y lo acumula en el estado de drift. No usa
+    `reservations_clustered`, que son los mismos datos de la referencia.
+    """
+    return pipeline([
+        node(nodes.clean_reservations,
+             inputs="reservations_incoming",
+             outputs="reservations_incoming_clean",
+             name="clean_incoming"),
+        node(nodes.assign_clusters,
+             inputs=["reservations_incoming_clean", "cluster_model", "reservation_embeddings"],
+             outputs="reservations_incoming_clustered",
+             name="assign_incoming"),
+        node(nodes.monitor_drift,
+             inputs=dict(df="reservations_incoming_clustered",
+                         reference="drift_reference",
+                         state="drift_state",
+                         params="params:drift"),
+             outputs=["drift_state_updated", "drift_report"],
+             name="monitor_drift"),
     ])
@@ -0,0 +1,105 @@
+"""
+Pre-entrenamiento de TabNet con controles de rendimiento:
+
+- presupuesto (épocas, batch / virtual batch, patience, learning rate)
+- validación sobre una muestra separada (no sobre todo el set de entrenamiento)
+- número de hilos de torch y modo determinista vs rápido
+- entrenamiento sobre una submuestra estratificada (los embeddings se
+  calculan después sobre todas las filas)
+- tiempo y pérdida por época
+"""
+import time
+
+import numpy as np
+import torch
+from pytorch_tabnet.callbacks import Callback
+from pytorch_tabnet.pretraining import TabNetPretrainer
+
+from .kselection import stratified_sample
+
+
+class EpochTimer(Callback):
+    """Registra duración y métricas (loss, valid loss) de cada época."""
+
+    def __init__(self):
+        super().__init__()
+        self.history = []
+        self._t0 = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._t0 = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        row = {"epoch": int(epoch), "seconds": time.perf_counter() - self._t0}
+        for key, value in (logs or {}).items():
+            if isinstance(value, (int, float, np.floating)):
+                row[key] = float(value)
+        self.history.append(row)
+
+
+def split_train_valid(n_rows: int, strata: np.ndarray, params: dict, random_state: int):
+    """
+    Índices (train, valid):
+    1) submuestra estratificada de `train_sample_rows` filas (o todas si es nulo)
+    2) de ésta se separa `valid_fraction` (tope `valid_max_rows`) para early-stopping
+    """
+    rng = np.random.default_rng(random_state)
+    sample_rows = params.get("train_sample_rows")
+    if sample_rows and sample_rows < n_rows:
+        idx = stratified_sample(strata, sample_rows, random_state)
+    else:
+        idx = np.arange(n_rows)
+
+    n_valid = int(len(idx) * params.get("valid_fraction", 0.1))
+    n_valid = min(n_valid, params.get("valid_max_rows") or n_valid)
+    n_valid = max(n_valid, 1) if len(idx) > 1 else 0
+    shuffled = rng.permutation(idx)
+    return np.sort(shuffled[n_valid:]), np.sort(shuffled[:n_valid])
+
+
+def pretrain_tabnet(X_array: np.ndarray, strata: np.ndarray, params: dict, random_state: int):
+    """
+    Pre-entrena TabNet según `params` (ver `tabnet` en parameters.yml).
+    Devuelve (tabnet, resumen) donde `resumen` trae tamaños, tiempos e historial por época.
+    """
+    torch.use_deterministic_algorithms(params.get("deterministic", True))
+    if params.get("torch_threads"):
+        torch.set_num_threads(params["torch_threads"])
+
+    train_idx, valid_idx = split_train_valid(len(X_array), strata, params, random_state)
+
+    tabnet = TabNetPretrainer(
+        optimizer_fn=torch.optim.Adam,
+        optimizer_params=dict(lr=params.get("learning_rate", 1e-3)),
+        seed=random_state,   # TabNet interno usará esta semilla también
+        verbose=0,
+    )
+    timer = EpochTimer()
+    t0 = time.perf_counter()
+    tabnet.fit(
+        X_train=X_array[train_idx],
+        eval_set=[X_array[valid_idx]],
+        eval_name=["valid"],
+        max_epochs=params.get("max_epochs", 100),
+        patience=params.get("patience", 10),
+        batch_size=params.get("batch_size", 256),
+        virtual_batch_size=params.get("virtual_batch_size", 128),
+        callbacks=[timer],
+    )
+    fit_seconds = time.perf_counter() - t0
+
+    # best_epoch = 0 es válido (la mejor época fue la primera): no usar `or`
+    best_epoch = getattr(tabnet, "best_epoch", None)
+    best_cost = getattr(tabnet, "best_cost", None)
+    summary = {
+        "n_train": int(len(train_idx)),
+        "n_valid": int(len(valid_idx)),
+        "torch_threads": torch.get_num_threads(),
+        "deterministic": bool(params.get("deterministic", True)),
+        "fit_seconds": fit_seconds,
+        "epochs_run": len(timer.history),
+        "best_epoch": int(best_epoch) if best_epoch is not None else -1,
+        "best_cost": float(best_cost) if best_cost is not None else float("nan"),
+        "history": timer.history,
+    }
+    return tabnet, summary
@@ -0,0 +1,89 @@
+"""
+Funciones de scoring compartidas por `assign_clusters` y el modo particionado:
+codificación de features -> embeddings TabNet -> etiqueta KMeans.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from reservations_pipeline.datasets.embedding_store import EmbeddingStore, row_keys
+
+from .encoding import CategoryEncoder
+
+
+def encode_features(df: pd.DataFrame, model: dict) -> np.ndarray:
+    """Matriz float32 (num_vars + cat_vars codificadas) lista para TabNet."""
+    num_vars = model["num_vars"]
+    cat_vars = model["cat_vars"]
+    encoders = model["encoders"]
+
+    # df[cols] ya devuelve un DataFrame nuevo; no hace falta otro .copy()
+    X = df[num_vars + cat_vars]
+    X = X.assign(**{col: _transform(encoders[col], X[col]) for col in cat_vars})
+    return X.fillna(-1).to_numpy(dtype=np.float32)
+
+
+def _transform(encoder, values: pd.Series) -> np.ndarray:
+    """
+    `CategoryEncoder` resuelve IDs no vistos con su bucket de desconocidos.
+    Los modelos entrenados antes de `CategoryEncoder` traen `LabelEncoder`:
+    se replica el mismo bucket (código = número de clases) en vez de fallar.
+    """
+    if isinstance(encoder, CategoryEncoder):
+        return encoder.transform(values)
+    classes = pd.Index(encoder.classes_)
+    codes = classes.get_indexer(values)
+    codes[codes == -1] = len(classes)
+    return codes
+
+
+def model_version(model: dict) -> str:
+    """
+    Identificador del modelo para el almacén de embeddings. `train_cluster` lo
+    guarda en `model["model_version"]`; para modelos anteriores se calcula a
+    partir de los pesos de la red de TabNet.
+    """
+    if "model_version" in model:
+        return model["model_version"]
+    return tabnet_fingerprint(model["tabnet"])
+
+
+def tabnet_fingerprint(tabnet) -> str:
+    """Hash (sha1, 16 hex) de los pesos de la red de TabNet."""
+    h = hashlib.sha1()
+    for name, tensor in sorted(tabnet.network.state_dict().items()):
+        h.update(name.encode())
+        h.update(tensor.detach().cpu().numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def embed(df: pd.DataFrame, model: dict, store: EmbeddingStore = None) -> np.ndarray:
+    """
+    Embeddings de TabNet para cada fila de `df`. Con `store`, sólo se calculan
+    (y se persisten) las filas cuyo contenido no está ya en el almacén.
+    """
+    if store is None:
+        embeddings, _ = model["tabnet"].predict(encode_features(df, model))
+        return embeddings
+
+    keys = row_keys(df, model["num_vars"] + model["cat_vars"])
+    return store.get_or_compute(
+        model_version(model), keys,
+        lambda missing: embed(df[missing], model),
+    )
+
+
+def predict(df: pd.DataFrame, model: dict, store: EmbeddingStore = None):
+    """
+    (etiquetas, distancias): centroide KMeans más cercano en el espacio de
+    embeddings y la distancia a él (insumo del monitoreo de drift).
+    """
+    distances = model["kmeans"].transform(embed(df, model, store))
+    labels = distances.argmin(axis=1)
+    return labels, distances[np.arange(len(labels)), labels]
+
+
+def predict_labels(df: pd.DataFrame, model: dict, store: EmbeddingStore = None) -> np.ndarray:
+    """Etiqueta KMeans (centroide más cercano en el espacio de embeddings)."""
+    return predict(df, model, store)[0]
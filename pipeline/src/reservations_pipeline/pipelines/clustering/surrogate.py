@@ -0,0 +1,97 @@
+"""
+Modelo sustituto (destilado) para scoring de baja latencia.
+
+El cluster "oficial" es el centroide KMeans más cercano en el espacio de
+embeddings de TabNet. Para scoring en línea eso implica un forward de TabNet
+por fila. Aquí se ajusta un árbol de decisión poco profundo sobre las
+variables originales que reproduce esas etiquetas, y se exporta a arreglos
+NumPy planos para poder evaluarlo sin sklearn ni torch.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def surrogate_features(df: pd.DataFrame, num_vars: list, cat_vars: list) -> np.ndarray:
+    """
+    Matriz float64 para el sustituto. Las categóricas son IDs numéricos en los
+    catálogos TCA, así que se usan directamente (sin encoder): un ID nuevo no
+    rompe el scoring, simplemente cae en alguna rama del árbol.
+    """
+    X = np.empty((len(df), len(num_vars) + len(cat_vars)), dtype=np.float64)
+    for j, col in enumerate(num_vars):
+        X[:, j] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=-1.0)
+    for j, col in enumerate(cat_vars, start=len(num_vars)):
+        X[:, j] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=-1.0)
+    return X
+
+
+class SurrogateScorer:
+    """
+    Árbol de decisión exportado a arreglos planos (feature, threshold,
+    children_left, children_right, label por nodo).
+
+    - `predict(X)`: scoring por lotes, vectorizado por niveles del árbol.
+    - `predict_one(record)`: una sola reserva (dict), recorrido en Python puro;
+      son `max_depth` comparaciones, del orden de microsegundos.
+    """
+
+    def __init__(self, tree, num_vars: list, cat_vars: list, classes: np.ndarray):
+        t = tree.tree_
+        self.num_vars = list(num_vars)
+        self.cat_vars = list(cat_vars)
+        self.feature_names = self.num_vars + self.cat_vars
+        self.feature = t.feature.astype(np.int64)
+        self.threshold = t.threshold.astype(np.float64)
+        self.children_left = t.children_left.astype(np.int64)
+        self.children_right = t.children_right.astype(np.int64)
+        self.node_label = np.asarray(classes)[t.value[:, 0, :].argmax(axis=1)]
+        self.max_depth = int(t.max_depth)
+
+        # Copias en listas de Python para el camino de una sola fila
+        # (indexar listas es más barato que indexar arreglos NumPy escalares).
+        self._feature = self.feature.tolist()
+        self._threshold = self.threshold.tolist()
+        self._left = self.children_left.tolist()
+        self._right = self.children_right.tolist()
+        self._label = self.node_label.tolist()
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Scoring vectorizado de una matriz (n_filas, n_features)."""
+        node = np.zeros(X.shape[0], dtype=np.int64)
+        rows = np.arange(X.shape[0])
+        for _ in range(self.max_depth):
+            internal = self.children_left[node] != -1
+            if not internal.any():
+                break
+            idx = rows[internal]
+            cur = node[idx]
+            go_left = X[idx, self.feature[cur]] <= self.threshold[cur]
+            node[idx] = np.where(go_left, self.children_left[cur], self.children_right[cur])
+        return self.node_label[node]
+
+    def predict_df(self, df: pd.DataFrame) -> np.ndarray:
+        return self.predict(surrogate_features(df, self.num_vars, self.cat_vars))
+
+    def predict_one(self, record: dict) -> int:
+        """
+        Scoring de una reserva individual (dict con las columnas del modelo).
+        Nulos / no numéricos -> -1.0, igual que `surrogate_features`, para que
+        lote y fila individual den siempre el mismo cluster.
+        """
+        values = []
+        for name in self.feature_names:
+            try:
+                value = float(record.get(name))
+            except (TypeError, ValueError):
+                value = -1.0
+            values.append(-1.0 if math.isnan(value) else value)
+        node = 0
+        left, right = self._left, self._right
+        while left[node] != -1:
+            if values[self._feature[node]] <= self._threshold[node]:
+                node = left[node]
+            else:
+                node = right[node]
+        return self._label[node]
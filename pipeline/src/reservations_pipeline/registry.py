@@ -0,0 +1,192 @@
+"""
+Registro de versiones de `cluster_model` y carga "en caliente" para servir.
+
+`cluster_model` es un PickleDataset versionado de Kedro::
+
+    data/06_models/cluster_model.pkl/<version>/cluster_model.pkl
+
+Los metadatos (best_k, sil_score, tiempo de entrenamiento, filas) los escribe
+el nodo `train` en `cluster_model_metadata`, otro JSON versionado que en la
+misma corrida de Kedro recibe la misma versión que el pickle::
+
+    data/06_models/cluster_model_metadata.json/<version>/cluster_model_metadata.json
+
+`ModelRegistry` lista las versiones y sus metadatos sin deserializar ningún
+modelo ni escribir nada (funciona en un despliegue de sólo lectura), y fija la
+versión activa en el archivo `ACTIVE` de la raíz (escrito de forma atómica).
+
+`ActiveModel` mantiene el modelo activo cargado en memoria. El cambio de
+versión se hace cargando el nuevo modelo fuera de cualquier lock y luego
+reemplazando una única referencia `(version, model)`: las peticiones en vuelo
+siguen usando la tupla que ya tomaron y nunca ven un modelo a medio cargar.
+"""
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+METADATA_KEYS = ("model_version", "best_k", "sil_score", "k_metric", "k_score",
+                 "training_seconds", "n_rows")
+
+
+def model_metadata(model: dict) -> dict:
+    """Metadatos serializables de un `cluster_model` (los guarda el nodo `train`)."""
+    return {k: model.get(k) for k in METADATA_KEYS}
+
+
+class ModelRegistry:
+    def __init__(self, root: str = "data/06_models/cluster_model.pkl",
+                 filename: str = "cluster_model.pkl",
+                 metadata_root: str = "data/06_models/cluster_model_metadata.json"):
+        self.root = Path(root)
+        self.filename = filename
+        self.metadata_root = Path(metadata_root)
+
+    # ── versiones ──────────────────────────────────────────────────────
+    def versions(self) -> list:
+        """Versiones disponibles, de la más antigua a la más reciente."""
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir()
+                      if (p / self.filename).is_file())
+
+    def latest_version(self):
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def _model_path(self, version: str) -> Path:
+        path = self.root / version / self.filename
+        if not path.is_file():
+            raise KeyError(f"No existe la versión de modelo '{version}' en {self.root}")
+        return path
+
+    def load(self, version: str = None) -> dict:
+        """Carga una versión (por defecto la activa)."""
+        version = version or self.active_version()
+        with open(self._model_path(version), "rb") as f:
+            return pickle.load(f)
+
+    # ── metadatos ──────────────────────────────────────────────────────
+    def metadata(self, version: str) -> dict:
+        """
+        Metadatos de una versión, leídos de `cluster_model_metadata`. Las
+        versiones entrenadas antes de ese dataset devuelven los campos en None.
+        """
+        model_path = self._model_path(version)
+        meta = dict.fromkeys(METADATA_KEYS)
+        meta_path = self.metadata_root / version / self.metadata_root.name
+        if meta_path.is_file():
+            meta.update(json.loads(meta_path.read_text(encoding="utf-8")))
+        meta["version"] = version
+        meta["size_bytes"] = model_path.stat().st_size
+        return meta
+
+    def list(self) -> list:
+        """Todas las versiones con sus metadatos y cuál está activa."""
+        active = self.active_version()
+        return [{**self.metadata(v), "active": v == active} for v in self.versions()]
+
+    # ── versión activa ─────────────────────────────────────────────────
+    @property
+    def _active_file(self) -> Path:
+        return self.root / "ACTIVE"
+
+    def active_version(self):
+        """Versión fijada en `ACTIVE`; si no hay ninguna, la más reciente."""
+        if self._active_file.is_file():
+            pinned = self._active_file.read_text(encoding="utf-8").strip()
+            if pinned:
+                return pinned
+        return self.latest_version()
+
+    def pin(self, version: str) -> None:
+        """Fija `version` como activa (reemplazo atómico del archivo ACTIVE)."""
+        self._model_path(version)
+        tmp = self.root / f".ACTIVE.{os.getpid()}.tmp"
+        tmp.write_text(version, encoding="utf-8")
+        os.replace(tmp, self._active_file)
+
+    def unpin(self) -> None:
+        """Vuelve a seguir la versión más reciente."""
+        if self._active_file.exists():
+            self._active_file.unlink()
+
+
+class ActiveModel:
+    """
+    Modelo activo precargado en memoria con hot-swap.
+
+        holder = ActiveModel(ModelRegistry(...))
+        version, model = holder.get()     # en cada petición
+        holder.start_polling(30)          # o llamar a holder.refresh()
+
+    `loader(version)` decide qué se mantiene en memoria; por defecto el pickle
+    completo (`registry.load`). Un proceso que no evalúa el modelo (la API,
+    que delega el scoring en Lambda) puede pasar algo más ligero, p. ej.
+    `registry.metadata`, y reutilizar igual el seguimiento de `ACTIVE`.
+    """
+
+    def __init__(self, registry: ModelRegistry, loader=None):
+        self.registry = registry
+        self.loader = loader or registry.load
+        self._swap_lock = threading.Lock()   # serializa recargas, no lecturas
+        self._current = (None, None)
+        self._poller = None
+        self._stop = threading.Event()
+        self.last_swap = {}
+        self.refresh()
+
+    @property
+    def version(self):
+        return self._current[0]
+
+    def get(self):
+        """(version, model) activos. Una sola lectura de atributo: atómica."""
+        return self._current
+
+    def refresh(self, version: str = None) -> bool:
+        """
+        Carga `version` (por defecto la activa del registro) si difiere de la
+        actual y la intercambia. Devuelve True si hubo cambio.
+        """
+        with self._swap_lock:
+            target = version or self.registry.active_version()
+            if target is None or target == self._current[0]:
+                return False
+
+            t0 = time.perf_counter()
+            model = self.loader(target)
+            t1 = time.perf_counter()
+            previous = self._current[0]
+            self._current = (target, model)
+            t2 = time.perf_counter()
+
+            self.last_swap = {"from": previous, "to": target,
+                              "load_seconds": t1 - t0, "swap_seconds": t2 - t1}
+            logger.info("Modelo activo: %s -> %s (carga %.2fs)", previous, target, t1 - t0)
+            return True
+
+    def _poll(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception:  # noqa: BLE001 - el modelo anterior sigue sirviendo
+                logger.exception("Fallo al recargar el modelo activo")
+
+    def start_polling(self, interval: float = 30.0) -> None:
+        if self._poller is not None:
+            return
+        self._stop.clear()
+        self._poller = threading.Thread(target=self._poll, args=(interval,), daemon=True)
+        self._poller.start()
+
+    def stop_polling(self) -> None:
+        if self._poller is not None:
+            self._stop.set()
+            self._poller.join()
+            self._poller = None
@@ -3,10 +3,12 @@ from the Kedro defaults. For further information, including these default values
 https://docs.kedro.org/en/stable/kedro_project_setup/settings.html."""
 
 # Instantiated project hooks.
-# For example, after creating a hooks.py and defining a ProjectHooks class there, do
-# from reservations_pipeline.hooks import ProjectHooks
+# ProjectHooks records per-node timing/memory and per-dataset I/O into
+# data/08_reporting/run_profiles. Set PIPELINE_PROFILE_NODE=<node> to profile a node.
 # Hooks are executed in a Last-In-First-Out (LIFO) order.
-# HOOKS = (ProjectHooks(),)
+from reservations_pipeline.hooks import ProjectHooks
+
+HOOKS = (ProjectHooks(),)
 
 # Installed plugins for which to disable hook auto-registration.
 # DISABLE_HOOKS_FOR_PLUGINS = ("kedro-viz",)
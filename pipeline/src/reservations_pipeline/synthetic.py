@@ -0,0 +1,134 @@
+"""
+Generador de reservaciones sintéticas con el esquema de `cols_keep`
+(ver `clean_reservations`), para pruebas de rendimiento sin datos reales.
+
+- IDs categóricos: tomados de los catálogos TCA (`data/TCA_iar_*.json` en la
+  raíz del repo) con una distribución tipo Zipf; además, con probabilidad
+  `mode_share` se usa la moda del cluster en `segment_profile.csv`. El orden
+  de popularidad de los IDs es fijo (`RANKING_SEED`), no depende de
+  `random_state`: lotes con semillas distintas tienen la misma distribución y
+  sirven para comparar drift o rendimiento entre corridas.
+- Numéricas: medias por cluster de `segment_profile.csv` (Poisson para conteos,
+  lognormal para la tarifa).
+- Una pequeña fracción de filas inválidas (tarifa negativa, 0 noches) para que
+  `clean_reservations` tenga trabajo real.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# columna -> (archivo de catálogo, llave de ID)
+CATALOGS = {
+    "ID_Agencia": ("TCA_iar_Agencias.json", "ID_Agencia"),
+    "ID_canal": ("TCA_iar_canales.json", "ID_canal"),
+    "ID_Pais_Origen": ("TCA_iar_Paises_origen.json", "ID_Pais_Origen"),
+    "ID_Segmento_Comp": ("TCA_iar_Segmentos_Comp.json", "ID_Segmento_Comp"),
+    "ID_Tipo_Habitacion": ("TCA_iar_Tipos_Habitaciones.json", "ID_Tipo_Habitacion"),
+    "ID_estatus_reservaciones": ("TCA_iar_estatus_reservaciones.json", "ID_estatus_reservaciones"),
+    "h_edo": ("TCA_iar_hotedo.json", "e_cod"),
+}
+
+# semilla del orden de popularidad de los IDs (independiente de `random_state`)
+RANKING_SEED = 0
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CATALOG_DIR = _PROJECT_ROOT.parent / "data"
+DEFAULT_PROFILE = _PROJECT_ROOT / "data" / "08_reporting" / "segment_profile.csv"
+
+
+def load_catalog_ids(catalog_dir: Path = DEFAULT_CATALOG_DIR) -> dict:
+    """{columna: arreglo de IDs válidos} (sin el ID 0 / "SIN DEFINIR")."""
+    ids = {}
+    for col, (filename, key) in CATALOGS.items():
+        with open(Path(catalog_dir) / filename, "r", encoding="utf-8") as f:
+            values = [str(item[key]).strip() for item in json.load(f)]
+        ids[col] = np.array([v for v in values if v not in ("", "0", "|")], dtype=object)
+    return ids
+
+
+def _zipf_choice(rng, values: np.ndarray, size: int, a: float = 1.2) -> np.ndarray:
+    """
+    Muestra `values` con pesos Zipf. El ranking sale de `RANKING_SEED`; `rng`
+    sólo se usa para muestrear.
+    """
+    ranked = np.random.default_rng(RANKING_SEED).permutation(values)
+    ranks = np.arange(1, len(values) + 1, dtype=np.float64)
+    p = ranks ** -a
+    return ranked[rng.choice(len(values), size=size, p=p / p.sum())]
+
+
+def generate_reservations(n_rows: int,
+                          catalog_dir: Path = DEFAULT_CATALOG_DIR,
+                          profile_path: Path = DEFAULT_PROFILE,
+                          random_state: int = 42,
+                          mode_share: float = 0.6,
+                          invalid_share: float = 0.01) -> pd.DataFrame:
+    """Devuelve un DataFrame "crudo" (como `reservations_raw`) de `n_rows` filas."""
+    rng = np.random.default_rng(random_state)
+    profile = pd.read_csv(profile_path)
+    catalog_ids = load_catalog_ids(catalog_dir)
+
+    # 1) Cluster latente de cada fila (todos con el mismo peso)
+    cluster = rng.integers(0, len(profile), size=n_rows)
+    p = profile.iloc[cluster].reset_index(drop=True)
+
+    # 2) Numéricas a partir de las medias del cluster
+    h_num_adu = 1 + rng.poisson(np.maximum(p["h_num_adu"].to_numpy() - 1, 0))
+    h_num_men = rng.poisson(p["h_num_men"].to_numpy())
+    h_num_noc = 1 + rng.poisson(np.maximum(p["h_num_noc"].to_numpy() - 1, 0))
+    h_tot_hab = 1 + rng.poisson(np.maximum(p["h_tot_hab"].to_numpy() - 1, 0))
+    sigma = 0.6
+    mu = np.log(p["h_tfa_total"].to_numpy()) - sigma ** 2 / 2
+    h_tfa_total = np.round(rng.lognormal(mu, sigma), 2)
+
+    df = pd.DataFrame({
+        "ID_Reserva": np.arange(1, n_rows + 1),
+        "h_num_per": h_num_adu + h_num_men,
+        "h_num_adu": h_num_adu,
+        "h_num_men": h_num_men,
+        "h_num_noc": h_num_noc,
+        "h_tot_hab": h_tot_hab,
+        "h_tfa_total": h_tfa_total,
+    })
+
+    # 3) Categóricas: moda del cluster o muestra Zipf del catálogo
+    for col in ["ID_Tipo_Habitacion", "ID_canal", "ID_Pais_Origen",
+                "ID_Segmento_Comp", "ID_Agencia"]:
+        sampled = _zipf_choice(rng, catalog_ids[col], n_rows)
+        use_mode = rng.random(n_rows) < mode_share
+        df[col] = np.where(use_mode, p[col].astype(str).to_numpy(), sampled)
+    for col in ["ID_estatus_reservaciones", "h_edo"]:
+        df[col] = _zipf_choice(rng, catalog_ids[col], n_rows)
+
+    # 4) Fechas coherentes: registro -> llegada (anticipación) -> salida (noches)
+    reg = pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 730, n_rows), unit="D")
+    lld = reg + pd.to_timedelta(rng.geometric(1 / 30, n_rows), unit="D")
+    df["h_fec_reg"] = reg
+    df["h_fec_lld"] = lld
+    df["h_fec_sda"] = lld + pd.to_timedelta(h_num_noc, unit="D")
+    df["Fecha_hoy"] = reg
+    df["h_ult_cam_fec"] = reg + pd.to_timedelta(rng.integers(0, 5, n_rows), unit="D")
+
+    # 5) Resto de columnas de `cols_keep`
+    df["ID_Programa"] = rng.integers(1, 5, n_rows).astype(str)
+    df["ID_empresa"] = rng.integers(1, 3, n_rows).astype(str)
+    df["ID_Paquete"] = rng.integers(1, 10, n_rows).astype(str)
+    df["Reservacion"] = 1
+    df["moneda_cve"] = np.where(rng.random(n_rows) < 0.85, "MXN", "USD")
+
+    # 6) Filas inválidas para ejercitar la limpieza
+    bad = rng.random(n_rows) < invalid_share
+    df.loc[bad & (rng.random(n_rows) < 0.5), "h_tfa_total"] *= -1
+    df.loc[bad & (df["h_tfa_total"] >= 0), "h_num_noc"] = 0
+
+    cols_keep = [
+        "ID_Reserva", "Fecha_hoy", "h_num_per", "h_num_adu", "h_num_men",
+        "h_num_noc", "h_tot_hab", "ID_Programa", "ID_empresa", "ID_Paquete",
+        "ID_Segmento_Comp", "ID_Agencia", "ID_Tipo_Habitacion", "ID_canal",
+        "h_fec_lld", "h_fec_reg", "h_fec_sda", "ID_Pais_Origen",
+        "Reservacion", "ID_estatus_reservaciones", "h_edo", "h_tfa_total",
+        "moneda_cve", "h_ult_cam_fec"
+    ]
+    return df[cols_keep]
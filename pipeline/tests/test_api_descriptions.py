@@ -0,0 +1,60 @@
+import contextlib
+import importlib
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("api")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(REPO_ROOT)
+        mp.syspath_prepend(str(REPO_ROOT))
+        for name in ("DRIFT_REFERENCE_PATH", "MODEL_REGISTRY_PATH", "CLUSTER_DESCRIPTIONS_PATH"):
+            mp.setenv(name, str(tmp / "missing"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            module = importlib.import_module("api")
+    yield module
+    sys.modules.pop("api", None)
+
+
+@pytest.fixture
+def descriptions(tmp_path):
+    root = tmp_path / "cluster_descriptions.json"
+    for version, model_version, name in [("2025-01-01T00.00.00.000Z", "aaa", "Viejo"),
+                                         ("2025-02-01T00.00.00.000Z", "bbb", "Nuevo")]:
+        (root / version).mkdir(parents=True)
+        (root / version / root.name).write_text(json.dumps({
+            "model_version": model_version,
+            "clusters": {"0": {"name": name, "description": "x"}},
+        }), encoding="utf-8")
+    return str(root)
+
+
+def _name(result):
+    return None if result is None else result[0]["name"]
+
+
+def test_match_by_model_version(api, descriptions):
+    assert _name(api.load_cluster_descriptions(descriptions, model_version="aaa")) == "Viejo"
+    assert _name(api.load_cluster_descriptions(descriptions, model_version="bbb")) == "Nuevo"
+    assert api.load_cluster_descriptions(descriptions, model_version="zzz") is None
+
+
+def test_without_model_version_only_exact_kedro_version(api, descriptions):
+    assert _name(api.load_cluster_descriptions(
+        descriptions, version="2025-01-01T00.00.00.000Z")) == "Viejo"
+    # modelo anterior a cluster_model_metadata y sin descripciones de su corrida
+    assert api.load_cluster_descriptions(descriptions, version="2024-12-01T00.00.00.000Z") is None
+
+
+def test_newest_without_version(api, descriptions):
+    assert _name(api.load_cluster_descriptions(descriptions)) == "Nuevo"
+    assert api.load_cluster_descriptions(descriptions + "-missing") is None
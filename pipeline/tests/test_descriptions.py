@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from reservations_pipeline.pipelines.clustering.descriptions import (
+    _unique_names,
+    describe_segments,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CATALOG_DIR = PROJECT_ROOT.parent / "data"
+CATALOGS = {
+    "habitaciones": "TCA_iar_Tipos_Habitaciones.json",
+    "canales": "TCA_iar_canales.json",
+    "paises": "TCA_iar_Paises_origen.json",
+    "segmentos": "TCA_iar_Segmentos_Comp.json",
+    "agencias": "TCA_iar_Agencias.json",
+}
+
+
+@pytest.fixture
+def catalogs():
+    return {arg: json.loads((CATALOG_DIR / name).read_text(encoding="utf-8"))
+            for arg, name in CATALOGS.items()}
+
+
+def test_describe_repo_profile(catalogs):
+    profile = pd.read_csv(PROJECT_ROOT / "data" / "08_reporting" / "segment_profile.csv")
+    out = describe_segments(profile, {"model_version": "abc", "best_k": len(profile)}, **catalogs)
+
+    assert out["model_version"] == "abc" and out["best_k"] == len(profile)
+    assert sorted(out["clusters"]) == sorted(str(c) for c in profile["cluster"])
+    names = [c["name"] for c in out["clusters"].values()]
+    assert len(set(names)) == len(names)
+    for cluster in out["clusters"].values():
+        assert set(cluster) == {"name", "description", "profile", "names"}
+        assert cluster["names"]["tipo_habitacion"] in cluster["description"]
+
+
+def test_unknown_ids_are_labeled(catalogs):
+    profile = pd.DataFrame([{
+        "cluster": 0, "h_num_per": 1.0, "h_num_adu": 1.0, "h_num_men": 0.0, "h_num_noc": 1.0,
+        "h_tot_hab": 1.0, "h_tfa_total": 1000.0, "ID_Tipo_Habitacion": 999999,
+        "ID_canal": 999999, "ID_Pais_Origen": 999999, "ID_Segmento_Comp": 999999,
+        "ID_Agencia": 999999,
+    }])
+    out = describe_segments(profile, {}, **catalogs)
+    assert out["model_version"] is None
+    assert out["clusters"]["0"]["names"]["canal"] == "ID 999999"
+
+
+def test_unique_names():
+    modes = {
+        "0": {"ID_Tipo_Habitacion": "ESTD", "ID_canal": "WEB", "ID_Segmento_Comp": "A",
+              "ID_Agencia": "X", "ID_Pais_Origen": "MX"},
+        "1": {"ID_Tipo_Habitacion": "ESTD", "ID_canal": "TEL", "ID_Segmento_Comp": "A",
+              "ID_Agencia": "X", "ID_Pais_Origen": "MX"},
+        "2": {"ID_Tipo_Habitacion": "ESTD", "ID_canal": "WEB", "ID_Segmento_Comp": "A",
+              "ID_Agencia": "X", "ID_Pais_Origen": "MX"},
+        "3": {"ID_Tipo_Habitacion": "ESTD", "ID_canal": "WEB", "ID_Segmento_Comp": "A",
+              "ID_Agencia": "X", "ID_Pais_Origen": "MX"},
+    }
+    names = _unique_names({"0": "Parejas", "1": "Parejas", "2": "Grupos", "3": "Grupos"}, modes)
+    assert names == {"0": "Parejas (canal WEB)", "1": "Parejas (canal TEL)",
+                     "2": "Grupos (cluster 2)", "3": "Grupos (cluster 3)"}
+    assert _unique_names({"0": "Parejas"}, modes) == {"0": "Parejas"}
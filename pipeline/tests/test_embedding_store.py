@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from reservations_pipeline.datasets import EmbeddingStore, EmbeddingStoreDataset
+from reservations_pipeline.datasets.embedding_store import row_keys
+
+
+def _batch(n, start=0, dim=4):
+    keys = np.arange(start, start + n, dtype=np.uint64)
+    embeddings = np.repeat(keys[:, None].astype(np.float32), dim, axis=1)
+    return keys, embeddings
+
+
+def test_lookup_across_shards(tmp_path):
+    store = EmbeddingStore(tmp_path)
+    assert store.append("v1", *_batch(5)) == 5
+    assert store.append("v1", *_batch(5, start=5)) == 5
+
+    query = np.array([7, 100, 2, 9], dtype=np.uint64)
+    found, emb = store.lookup("v1", query)
+    np.testing.assert_array_equal(found, [True, False, True, True])
+    np.testing.assert_array_equal(emb[:, 0], [7, 2, 9])
+    assert len(list((tmp_path / "v1").glob("shard-*.keys.npy"))) == 2
+
+
+def test_append_dedups_existing_and_repeated_keys(tmp_path):
+    store = EmbeddingStore(tmp_path)
+    store.append("v1", *_batch(4))
+    keys = np.array([2, 3, 4, 4, 5], dtype=np.uint64)
+    emb = keys[:, None].astype(np.float32).repeat(4, axis=1)
+
+    assert store.append("v1", keys, emb) == 2
+    assert store.append("v1", keys, emb) == 0
+    assert len(store) == 6
+
+
+def test_versions_are_isolated(tmp_path):
+    store = EmbeddingStore(tmp_path)
+    store.append("v1", *_batch(3))
+    found, emb = store.lookup("v2", np.arange(3, dtype=np.uint64))
+    assert not found.any() and emb is None
+    assert store.versions() == ["v1"]
+
+
+def test_get_or_compute_only_computes_missing(tmp_path):
+    store = EmbeddingStore(tmp_path)
+    store.append("v1", *_batch(3))
+    keys = np.array([0, 10, 2, 11], dtype=np.uint64)
+    calls = []
+
+    def compute(mask):
+        calls.append(mask.copy())
+        return keys[mask, None].astype(np.float32).repeat(4, axis=1)
+
+    out = store.get_or_compute("v1", keys, compute)
+    np.testing.assert_array_equal(out[:, 0], [0, 10, 2, 11])
+    np.testing.assert_array_equal(calls[0], [False, True, False, True])
+
+    store.get_or_compute("v1", keys, compute)
+    assert len(calls) == 1
+
+
+def test_prune_keeps_newest_and_pinned(tmp_path):
+    store = EmbeddingStore(tmp_path)
+    for i, version in enumerate(["old", "mid", "new"]):
+        store.append(version, *_batch(2))
+        for p in (tmp_path / version).iterdir():
+            os.utime(p, (1_000 + i, 1_000 + i))
+
+    assert store.prune(1, keep=("old",)) == ["mid"]
+    assert store.versions() == ["new", "old"]
+
+
+def test_dataset_save_applies_retention(tmp_path):
+    ds = EmbeddingStoreDataset(str(tmp_path), keep_versions=1)
+    for version in ["a", "b"]:
+        keys, emb = _batch(2)
+        ds.save({"model_version": version, "keys": keys, "embeddings": emb})
+    assert ds.load().versions() == ["b"]
+
+
+def test_row_keys_ignore_index():
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    np.testing.assert_array_equal(row_keys(df, ["a", "b"]),
+                                  row_keys(df.set_axis([10, 20]), ["a", "b"]))
@@ -0,0 +1,52 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from reservations_pipeline.pipelines.clustering.encoding import CategoryEncoder
+from reservations_pipeline.pipelines.clustering.scoring import _transform
+
+
+def test_codes_match_label_encoder():
+    values = pd.Series(["10", "2", "157", "2", "33", "10", "157"])
+    encoder = CategoryEncoder().fit(values)
+    label = LabelEncoder().fit(values)
+
+    np.testing.assert_array_equal(encoder.categories_, label.classes_)
+    np.testing.assert_array_equal(encoder.transform(values), label.transform(values))
+
+
+def test_unknown_and_null_go_to_bucket():
+    encoder = CategoryEncoder().fit(pd.Series(["1", "2", "3"]))
+    codes = encoder.transform(pd.Series(["2", "999", None, "1"]))
+
+    assert encoder.unknown_code == 3
+    np.testing.assert_array_equal(codes, [1, 3, 3, 0])
+    assert encoder.unknown_rate(pd.Series(["1", "999", None, "3"])) == 0.5
+
+
+def test_numeric_and_string_ids_share_keys():
+    encoder = CategoryEncoder().fit(pd.Series(["157", "20"]))
+    np.testing.assert_array_equal(encoder.transform(pd.Series([157.0, 20.0, np.nan])), [0, 1, 2])
+    np.testing.assert_array_equal(encoder.transform(pd.Series([157, 20])), [0, 1])
+
+
+def test_frequencies_and_pickle_roundtrip():
+    values = pd.Series(["a", "b", "a", None])
+    encoder = CategoryEncoder().fit(values)
+    assert encoder.frequencies_ == {"a": 2, "b": 1}
+    assert encoder.unknown_count_ == 1
+
+    restored = pickle.loads(pickle.dumps(encoder))
+    np.testing.assert_array_equal(restored.transform(values), encoder.transform(values))
+
+
+def test_legacy_label_encoder_fallback_uses_same_bucket():
+    train = pd.Series(["1", "2", "3"])
+    values = pd.Series(["3", "404", "1"])
+    legacy = LabelEncoder().fit(train)
+
+    np.testing.assert_array_equal(_transform(legacy, values), [2, 3, 0])
+    np.testing.assert_array_equal(_transform(legacy, values),
+                                  _transform(CategoryEncoder().fit(train), values))
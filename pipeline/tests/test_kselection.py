@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from reservations_pipeline.pipelines.clustering.kselection import (
+    candidate_ks,
+    select_k,
+    stratified_sample,
+)
+
+
+def _blobs(k=3, n_per=200, dim=4, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0, 20, (k, dim))
+    X = np.concatenate([c + rng.normal(0, 1, (n_per, dim)) for c in centers])
+    return X.astype(np.float32)
+
+
+def test_candidate_ks():
+    assert candidate_ks(4, {}) == [3, 4, 5]
+    assert candidate_ks(4, {"k_radius": 0}) == [4]
+    assert candidate_ks(2, {"k_radius": 2}) == [2, 3, 4]
+    assert candidate_ks(4, {"k_min": 2, "k_max": None}) == [2, 3, 4, 5]
+    assert candidate_ks(4, {"k_max": 8}) == [3, 4, 5, 6, 7, 8]
+    with pytest.raises(ValueError):
+        candidate_ks(4, {"k_min": 6, "k_max": 5})
+
+
+def test_stratified_sample_keeps_proportions():
+    labels = np.repeat([0, 1, 2], [900, 90, 10])
+    idx = stratified_sample(labels, 100, random_state=0)
+    counts = np.bincount(labels[idx], minlength=3)
+
+    assert np.all(np.diff(idx) > 0)
+    np.testing.assert_array_equal(counts, [90, 9, 2])
+    np.testing.assert_array_equal(stratified_sample(labels, None, 0), np.arange(1000))
+    np.testing.assert_array_equal(stratified_sample(labels, 5000, 0), np.arange(1000))
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_select_k_finds_true_k(n_jobs):
+    X = _blobs(k=3)
+    cfg = {"metric": "silhouette", "metrics": ["calinski_harabasz"],
+           "sample_size": 300, "n_jobs": n_jobs, "threads_per_job": 1, "algorithm": "kmeans"}
+    model, best_k, score, candidates = select_k(X, [2, 3, 4], cfg, random_state=0)
+
+    assert best_k == 3 and model.n_clusters == 3
+    assert [c["k"] for c in candidates] == [2, 3, 4]
+    assert score == max(c["scores"]["silhouette"] for c in candidates)
+    assert all(set(c["scores"]) == {"silhouette", "calinski_harabasz"} for c in candidates)
+    assert all("model" not in c for c in candidates)
+
+
+def test_select_k_lower_is_better_metric():
+    X = _blobs(k=3, seed=1)
+    cfg = {"metric": "davies_bouldin", "metrics": [], "n_jobs": 1, "algorithm": "kmeans"}
+    _, best_k, score, candidates = select_k(X, [2, 3, 4], cfg, random_state=0)
+    assert best_k == 3
+    assert score == min(c["scores"]["davies_bouldin"] for c in candidates)
+
+
+def test_select_k_rejects_unknown_metric():
+    with pytest.raises(ValueError):
+        select_k(_blobs(), [2, 3], {"metric": "inertia"}, random_state=0)
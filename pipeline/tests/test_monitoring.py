@@ -0,0 +1,135 @@
+import json
+
+import numpy as np
+import pytest
+
+from reservations_pipeline.monitoring import (
+    CAT_VARS,
+    NUM_VARS,
+    DriftMonitor,
+    DriftReference,
+    merge_state_file,
+    psi,
+)
+
+
+def _batch(n, seed, shift=0.0):
+    rng = np.random.default_rng(seed)
+    columns = {c: rng.normal(10 + shift, 2, n) for c in NUM_VARS}
+    columns.update({c: rng.integers(0, 5, n).astype(str) for c in CAT_VARS})
+    clusters = rng.integers(0, 3, n)
+    distances = rng.gamma(2.0, 1.0 + shift, n)
+    return columns, clusters, distances
+
+
+@pytest.fixture
+def reference():
+    return DriftReference.fit(*_batch(5000, seed=0))
+
+
+def test_psi():
+    assert psi([10, 20, 30], [10, 20, 30]) == pytest.approx(0.0)
+    assert psi([10, 20, 30], [30, 20, 10]) > 0.25
+    assert psi([10, 20], [0, 0]) is None
+    assert psi([0, 0], [1, 2]) is None
+
+
+def test_merge_matches_single_monitor(reference):
+    a, b = _batch(300, seed=1), _batch(500, seed=2)
+    ts = np.full(300, 1_700_000_000), np.full(500, 1_700_100_000)
+
+    single = DriftMonitor(reference)
+    single.update(*a, timestamps=ts[0])
+    single.update(*b, timestamps=ts[1])
+
+    left, right = DriftMonitor(reference), DriftMonitor(reference)
+    left.update(*a, timestamps=ts[0])
+    right.update(*b, timestamps=ts[1])
+    merged = left.merge(right)
+
+    assert merged.to_dict() == single.to_dict()
+    assert merged.report() == single.report()
+
+
+def test_repeated_batch_is_not_counted_twice(reference):
+    monitor = DriftMonitor(reference)
+    assert monitor.update(*_batch(200, seed=1), batch_id="lote-1")
+    assert not monitor.update(*_batch(200, seed=1), batch_id="lote-1")
+    assert monitor.n_rows == 200
+
+    restored = DriftMonitor.from_dict(reference, json.loads(json.dumps(monitor.to_dict())))
+    assert not restored.update(*_batch(200, seed=1), batch_id="lote-1")
+    assert restored.n_rows == 200
+
+
+def test_empty_report_is_strict_json(reference):
+    report = DriftMonitor(reference).report()
+    assert report["n_rows"] == 0 and not report["retrain"]
+    json.dumps(report, allow_nan=False)
+
+
+def test_report_flags_shifted_data(reference):
+    same, shifted = DriftMonitor(reference), DriftMonitor(reference)
+    same.update(*_batch(5000, seed=3))
+    shifted.update(*_batch(5000, seed=3, shift=3.0))
+
+    assert not same.report()["retrain"]
+    report = shifted.report()
+    assert report["retrain"]
+    assert all(report["feature_psi"][c] > 0.25 for c in NUM_VARS)
+    json.dumps(report, allow_nan=False)
+
+
+def test_unseen_cluster_and_column_without_counts(reference):
+    columns, clusters, distances = _batch(100, seed=4)
+    del columns["h_tfa_total"]
+    monitor = DriftMonitor(reference)
+    monitor.update(columns, np.full(100, 9), distances)
+
+    report = monitor.report(min_rows=1)
+    assert report["feature_psi"]["h_tfa_total"] is None
+    assert report["cluster_share"]["unseen"]["current"] == 1.0
+    json.dumps(report, allow_nan=False)
+
+
+def test_merge_state_file(tmp_path, reference):
+    path = tmp_path / "drift_state.json"
+    first = DriftMonitor(reference)
+    first.update(*_batch(100, seed=5))
+    merge_state_file(path, first, batch_id="api-1")
+    merge_state_file(path, first, batch_id="api-1")
+    second = DriftMonitor(reference)
+    second.update(*_batch(50, seed=6))
+    state = merge_state_file(path, second, batch_id="api-2")
+
+    assert state.n_rows == 150
+    stored = DriftMonitor.from_dict(reference, json.loads(path.read_text(encoding="utf-8")))
+    assert stored.n_rows == 150 and stored.batch_ids == ["api-1", "api-2"]
+
+    other = DriftReference.fit(*_batch(5000, seed=7, shift=1.0))
+    with pytest.raises(ValueError):
+        DriftMonitor.from_dict(other, stored.to_dict())
+    fresh = DriftMonitor(other)
+    fresh.update(*_batch(10, seed=8))
+    assert merge_state_file(path, fresh).n_rows == 10
+
+
+def test_train_quantiles_do_not_depend_on_current_data(reference):
+    _, _, train_distances = _batch(5000, seed=0)
+    expected = reference.to_dict()
+    assert expected["distance_min"] == pytest.approx(train_distances.min())
+    assert expected["distance_max"] == pytest.approx(train_distances.max())
+
+    baseline = DriftMonitor(reference).distance_quantiles(reference=True)
+    assert baseline["0.99"] == pytest.approx(np.quantile(train_distances, 0.99), rel=0.05)
+
+    columns, clusters, distances = _batch(200, seed=9)
+    distances[0] = 100.0
+    monitor = DriftMonitor(reference)
+    monitor.update(columns, clusters, distances)
+    report = monitor.report()
+    assert report["distance_quantiles"]["train"] == baseline
+    assert report["distance_quantiles"]["current"] != baseline
+
+    restored = DriftReference.from_dict(json.loads(json.dumps(reference.to_dict())))
+    assert DriftMonitor(restored).distance_quantiles(reference=True) == baseline
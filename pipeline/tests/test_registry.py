@@ -0,0 +1,55 @@
+import json
+import os
+import pickle
+
+import pytest
+
+from reservations_pipeline.registry import METADATA_KEYS, ActiveModel, ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    models = tmp_path / "cluster_model.pkl"
+    metadata = tmp_path / "cluster_model_metadata.json"
+    for i, version in enumerate(["2024-01-01T00.00.00.000Z", "2024-02-01T00.00.00.000Z"]):
+        (models / version).mkdir(parents=True)
+        with open(models / version / "cluster_model.pkl", "wb") as f:
+            pickle.dump({"best_k": 4 + i}, f)
+    (metadata / "2024-02-01T00.00.00.000Z").mkdir(parents=True)
+    (metadata / "2024-02-01T00.00.00.000Z" / "cluster_model_metadata.json").write_text(
+        json.dumps({"best_k": 5, "model_version": "abc"}), encoding="utf-8")
+    return ModelRegistry(models, metadata_root=metadata)
+
+
+def test_list_reads_metadata_without_writing(registry, monkeypatch):
+    monkeypatch.setattr(pickle, "load", lambda *a, **k: pytest.fail("list() no debe deserializar"))
+    before = sorted(os.walk(registry.root))
+
+    listed = registry.list()
+    assert [m["version"] for m in listed] == registry.versions()
+    assert listed[0]["best_k"] is None and set(METADATA_KEYS) <= set(listed[0])
+    assert listed[1]["best_k"] == 5 and listed[1]["model_version"] == "abc"
+    assert listed[1]["active"] and not listed[0]["active"]
+    assert sorted(os.walk(registry.root)) == before
+
+
+def test_pin_and_unpin(registry):
+    first, latest = registry.versions()
+    registry.pin(first)
+    assert registry.active_version() == first
+    with pytest.raises(KeyError):
+        registry.pin("no-existe")
+    registry.unpin()
+    assert registry.active_version() == latest
+
+
+def test_active_model_follows_pin_with_custom_loader(registry):
+    first, latest = registry.versions()
+    holder = ActiveModel(registry, loader=registry.metadata)
+    assert holder.get()[1]["best_k"] == 5
+
+    registry.pin(first)
+    assert holder.refresh()
+    assert holder.version == first and holder.last_swap["from"] == latest
+    assert not holder.refresh()
+    assert ActiveModel(registry).get()[1] == {"best_k": 4}
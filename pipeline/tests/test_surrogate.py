@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from reservations_pipeline.pipelines.clustering.surrogate import (
+    SurrogateScorer,
+    surrogate_features,
+)
+
+NUM_VARS = ["h_num_per", "h_num_noc", "h_tfa_total"]
+CAT_VARS = ["ID_canal", "ID_Agencia"]
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 2000
+    df = pd.DataFrame({
+        "h_num_per": rng.integers(1, 6, n),
+        "h_num_noc": rng.integers(1, 10, n),
+        "h_tfa_total": rng.gamma(2.0, 3000.0, n),
+        "ID_canal": rng.integers(0, 14, n).astype(str),
+        "ID_Agencia": rng.integers(0, 130, n).astype(str),
+    })
+    y = ((df["h_num_per"] > 2).astype(int) + 2 * (df["h_tfa_total"] > 6000)).to_numpy()
+    X = surrogate_features(df, NUM_VARS, CAT_VARS)
+    tree = DecisionTreeClassifier(max_depth=6, random_state=0).fit(X, y)
+    return df, X, tree
+
+
+def test_predict_matches_sklearn(data):
+    df, X, tree = data
+    scorer = SurrogateScorer(tree, NUM_VARS, CAT_VARS, tree.classes_)
+    np.testing.assert_array_equal(scorer.predict(X), tree.predict(X))
+    np.testing.assert_array_equal(scorer.predict_df(df), tree.predict(X))
+
+
+def test_predict_one_matches_batch(data):
+    df, X, tree = data
+    scorer = SurrogateScorer(tree, NUM_VARS, CAT_VARS, tree.classes_)
+    batch = scorer.predict(X[:200])
+    single = [scorer.predict_one(rec) for rec in df.iloc[:200].to_dict("records")]
+    np.testing.assert_array_equal(batch, single)
+
+
+def test_missing_values_consistent_between_paths(data):
+    df, _, tree = data
+    scorer = SurrogateScorer(tree, NUM_VARS, CAT_VARS, tree.classes_)
+    rows = df.iloc[:50].astype(object).copy()
+    rows["h_tfa_total"] = np.nan
+    rows["ID_canal"] = "desconocido"
+    rows.loc[rows.index[::2], "h_num_per"] = None
+    batch = scorer.predict_df(rows)
+    single = [scorer.predict_one(rec) for rec in rows.to_dict("records")]
+    np.testing.assert_array_equal(batch, single)
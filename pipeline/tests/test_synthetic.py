@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from reservations_pipeline.monitoring import psi
+from reservations_pipeline.synthetic import generate_reservations
+
+ID_COLS = ["ID_Tipo_Habitacion", "ID_canal", "ID_Pais_Origen", "ID_Segmento_Comp",
+           "ID_Agencia", "ID_estatus_reservaciones", "h_edo"]
+
+
+def test_same_seed_is_reproducible():
+    pd.testing.assert_frame_equal(generate_reservations(500, random_state=1),
+                                  generate_reservations(500, random_state=1))
+
+
+def test_id_distributions_do_not_depend_on_seed():
+    a = generate_reservations(20_000, random_state=3)
+    b = generate_reservations(20_000, random_state=42)
+    assert not a.equals(b)
+    for col in ID_COLS:
+        counts = pd.concat([a[col].value_counts(), b[col].value_counts()], axis=1).fillna(0)
+        assert psi(counts.iloc[:, 0], counts.iloc[:, 1]) < 0.1, col
+
+
+def test_schema_and_invalid_rows():
+    df = generate_reservations(5_000, random_state=0, invalid_share=0.05)
+    assert len(df) == 5_000 and "ID_Reserva" in df
+    assert ((df["h_tfa_total"] < 0) | (df["h_num_noc"] == 0)).any()
+    assert np.all(df["h_num_per"] == df["h_num_adu"] + df["h_num_men"])